@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import random
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+UNDERWRITE_SCRIPT = ROOT / "skills" / "credit-underwriter" / "scripts" / "underwrite.py"
+
+FILLER = [
+    "Accounts receivable aging - current bucket",
+    "Inventory turns noted by management",
+    "Capital expenditures: $120,000",
+    "Notes to the statement, see schedule B",
+    "Interest income: $4,500",
+    "Cash on hand: $310,000",
+]
+TAIL = [
+    "Gross Revenue: $2,450,000",
+    "Operating Expenses: $1,610,000",
+    "Depreciation: $95,000",
+    "Total Annual Debt Service: $420,000",
+    "Proposed Loan Amount: $1,500,000",
+]
+
+
+def load_underwriter():
+    spec = importlib.util.spec_from_file_location("underwrite", UNDERWRITE_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synth_statement(rng: random.Random, megabytes: float, missing: int) -> str:
+    # Labels sit at the end of a large package (the worst case for the scan)
+    # and `missing` of them are absent, which forces a full pass per field.
+    lines = []
+    size = 0
+    while size < megabytes * 1_000_000:
+        line = rng.choice(FILLER)
+        lines.append(line)
+        size += len(line) + 1
+    lines.extend(TAIL[: len(TAIL) - missing])
+    return "\n".join(lines) + "\n"
+
+
+def best_of(repeat: int, func, *args) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Financials field extraction on a multi-MB statement.")
+    parser.add_argument("--megabytes", type=float, default=8.0)
+    parser.add_argument("--missing", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    underwrite = load_underwriter()
+    text = synth_statement(random.Random(args.seed), args.megabytes, args.missing)
+
+    def per_field(source):
+        return {key: underwrite.extract_field(source, labels) for key, labels in underwrite.FIELDS.items()}
+
+    expected = per_field(text)
+    actual = underwrite.extract_fields(text)
+    if actual != expected:
+        raise SystemExit(f"extract_fields mismatch: {actual} != {expected}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "financials.txt"
+        path.write_text(text, encoding="utf-8")
+
+        def streamed():
+            return underwrite.scan_statement(underwrite.iter_blocks(path))
+
+        if streamed()[0] != expected:
+            raise SystemExit(f"scan_statement mismatch: {streamed()[0]} != {expected}")
+
+        legacy = best_of(args.repeat, per_field, text)
+        single = best_of(args.repeat, underwrite.extract_fields, text)
+        stream = best_of(args.repeat, streamed)
+    print(f"statement: {len(text) / 1_000_000:.1f} MB, {text.count(chr(10))} lines, {args.missing} label(s) missing")
+    print(f"extract_field per key: {legacy * 1000:9.1f} ms")
+    print(f"extract_fields:        {single * 1000:9.1f} ms  ({legacy / single:.1f}x)")
+    print(f"streamed from file:    {stream * 1000:9.1f} ms  (reads {underwrite.STREAM_BLOCK_CHARS:,} chars at a time)")
+
+
+if __name__ == "__main__":
+    main()
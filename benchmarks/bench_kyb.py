@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import random
+import tempfile
+from pathlib import Path
+
+from bench_financials import best_of
+from synth import write_articles
+
+ROOT = Path(__file__).resolve().parents[1]
+KYB_SCRIPT = ROOT / "skills" / "kyb-gatekeeper" / "scripts" / "kyb_extract.py"
+
+
+def load_kyb():
+    spec = importlib.util.spec_from_file_location("kyb_extract", KYB_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def main():
+    parser = argparse.ArgumentParser(description="KYB extraction on long articles / operating agreements.")
+    parser.add_argument("--owners", type=int, default=20_000)
+    parser.add_argument("--sections", type=int, default=200_000, help="filler provisions after the owner list")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    kyb = load_kyb()
+    with tempfile.TemporaryDirectory(prefix="bench_kyb_") as temp_dir:
+        path = write_articles(Path(temp_dir) / "articles_inc.txt", random.Random(args.seed), args.owners, args.sections)
+        megabytes = path.stat().st_size / 1_000_000
+        found = kyb.scan_articles(kyb.read_articles_lines(path))
+        elapsed = best_of(args.repeat, lambda: kyb.scan_articles(kyb.read_articles_lines(path)))
+
+    print(f"articles: {megabytes:.1f} MB, {args.owners} owners, {args.sections} provisions")
+    print(f"found: {found['entity_name']} / {found['state']}, {len(found['ubo_list'])} UBOs over 25%")
+    print(f"scan_articles: {elapsed * 1000:9.1f} ms  ({megabytes / elapsed:.1f} MB/s)")
+
+
+if __name__ == "__main__":
+    main()
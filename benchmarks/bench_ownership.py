@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import random
+import time
+from pathlib import Path
+
+from bench_sanctions import synth_names
+
+ROOT = Path(__file__).resolve().parents[1]
+GRAPH_SCRIPT = ROOT / "skills" / "kyb-gatekeeper" / "scripts" / "ownership_graph.py"
+
+
+def load_graph_module():
+    spec = importlib.util.spec_from_file_location("ownership_graph", GRAPH_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synth_group(rng: random.Random, entities: int, layers: int, people: int):
+    # Layered corporate group: every entity is held by a few entities of the
+    # next layer up (shared holdcos make a DAG with many chains) and, on the
+    # top layer, by people only.
+    names = [f"Group Entity {index} LLC" for index in range(entities)]
+    per_layer = max(1, entities // layers)
+    owners = synth_names(rng, people)
+    group = []
+    for index, name in enumerate(names):
+        layer = index // per_layer
+        upper = names[(layer + 1) * per_layer:(layer + 2) * per_layer]
+        holders = rng.sample(upper, min(len(upper), rng.randint(2, 4))) if upper else []
+        holders += rng.sample(owners, rng.randint(1, 3))
+        shares = [rng.random() for _ in holders]
+        total = sum(shares)
+        group.append((name, [
+            {"name": holder, "role": "Member", "ownership_pct": round(share / total * 100, 2)}
+            for holder, share in zip(holders, shares)
+        ]))
+    return group
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Effective ownership across a large corporate group.")
+    parser.add_argument("--entities", type=int, default=5000)
+    parser.add_argument("--layers", type=int, default=10)
+    parser.add_argument("--people", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    ownership_graph = load_graph_module()
+    group = synth_group(random.Random(args.seed), args.entities, args.layers, args.people)
+
+    started = time.perf_counter()
+    graph = ownership_graph.OwnershipGraph()
+    for name, holdings in group:
+        graph.add_entity(name, holdings)
+    built = time.perf_counter() - started
+
+    started = time.perf_counter()
+    owners = graph.effective_owners(group[0][0])
+    resolved = time.perf_counter() - started
+
+    edges = sum(len(holdings) for _, holdings in group)
+    print(f"group: {args.entities} entities, {edges} holdings, {args.layers} layers")
+    print(f"build: {built * 1000:8.1f} ms   resolve: {resolved * 1000:8.1f} ms")
+    print(f"{len(owners)} ultimate owners of {group[0][0]}, "
+          f"{sum(owner['ownership_pct'] > 25 for owner in owners)} over 25%, "
+          f"total {sum(owner['ownership_pct'] for owner in owners):.2f}%")
+
+
+if __name__ == "__main__":
+    main()
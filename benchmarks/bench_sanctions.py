@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import random
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SCREEN_SCRIPT = ROOT / "skills" / "regulatory-shield" / "scripts" / "regulatory_screen.py"
+
+SYLLABLES = [
+    "al", "an", "ar", "ba", "be", "da", "de", "el", "en", "fa", "ga", "ha", "ib", "ka", "ki",
+    "la", "li", "ma", "mo", "mu", "na", "ni", "or", "pa", "ra", "ri", "sa", "se", "sh", "ta",
+    "to", "va", "vi", "ya", "za", "med", "son", "ov", "ez", "in",
+]
+
+
+def load_screen():
+    spec = importlib.util.spec_from_file_location("regulatory_screen", SCREEN_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synth_word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+
+
+def synth_names(rng: random.Random, count: int):
+    return [f"{synth_word(rng)} {synth_word(rng)}" for _ in range(count)]
+
+
+def perturb(rng: random.Random, name: str) -> str:
+    position = rng.randrange(1, len(name))
+    if name[position] == " ":
+        return name
+    return name[:position] + rng.choice("aeiouy") + name[position + 1:]
+
+
+def percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def timed(fn, names):
+    latencies = []
+    hits = 0
+    for name in names:
+        started = time.perf_counter()
+        result = fn(name)
+        latencies.append(time.perf_counter() - started)
+        hits += result is not None
+    return latencies, hits
+
+
+def report(label: str, latencies, hits: int):
+    print(
+        f"{label:<10} ubos={len(latencies)} hits={hits} "
+        f"p50={percentile(latencies, 50) * 1e3:.3f}ms "
+        f"p99={percentile(latencies, 99) * 1e3:.3f}ms "
+        f"max={max(latencies) * 1e3:.3f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-UBO sanctions screening latency on a synthetic list.")
+    parser.add_argument("--names", type=int, default=500_000)
+    parser.add_argument("--ubos", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--linear", type=int, default=3, help="UBOs to time against the full-scan baseline")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    screen = load_screen()
+    rng = random.Random(args.seed)
+    names = synth_names(rng, args.names)
+
+    started = time.perf_counter()
+    index = screen.SanctionsIndex(names)
+    print(f"index build: {args.names} names in {time.perf_counter() - started:.2f}s")
+
+    # Half near-misses of listed names (fuzzy territory), half unseen names.
+    ubos = [perturb(rng, rng.choice(names)) for _ in range(args.ubos // 2)]
+    ubos += synth_names(rng, args.ubos - len(ubos))
+
+    report("index", *timed(index.match, ubos))
+    report("fuzzy", *timed(lambda name: index.fuzzy_match(name, args.threshold), ubos))
+
+    if args.linear:
+        def linear(name):
+            for entry in names:
+                if screen.sanctions_match(name, entry):
+                    return entry
+            return None
+
+        report("linear", *timed(linear, ubos[-args.linear:]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_sanctions import synth_names
+from synth import write_client
+
+ROOT = Path(__file__).resolve().parents[1]
+BATCH_SCRIPT = ROOT / "skills" / "commercial-lending-autopilot" / "scripts" / "run_batch.py"
+DATA_DIR = ROOT / ".cache" / "bench" / "short_circuit"
+SEED = 2024
+
+
+def prepare_data(spec: dict) -> Path:
+    # Clients with synthetic statements and logs; a blocked_rate share of them
+    # has a sanctioned owner, so compliance flags them CRITICAL.
+    directory = DATA_DIR / "-".join(f"{key}{value}" for key, value in sorted(spec.items()))
+    marker = directory / "spec.json"
+    if marker.exists() and json.loads(marker.read_text(encoding="utf-8")) == spec:
+        return directory
+    rng = random.Random(spec["seed"])
+    blocked = set(rng.sample(range(spec["clients"]), round(spec["clients"] * spec["blocked_rate"])))
+    sanctioned = synth_names(rng, 200)
+    for index in range(spec["clients"]):
+        client_dir = directory / "clients" / f"client-{index:04d}"
+        write_client(client_dir, spec["seed"] + index, 20, spec["megabytes"], spec["transactions"])
+        if index in blocked:
+            with (client_dir / "articles_inc.txt").open("a", encoding="utf-8") as handle:
+                handle.write(f"- {sanctioned[index % len(sanctioned)]}, Director (40% Ownership)\n")
+    (directory / "sanctions.txt").write_text("\n".join(sanctioned) + "\n", encoding="utf-8")
+    marker.write_text(json.dumps(spec), encoding="utf-8")
+    return directory
+
+
+def children_cpu() -> float:
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def run_batch(data: Path, output_dir: Path, mode: str, workers: int, short_circuit: bool) -> dict:
+    command = [
+        sys.executable, str(BATCH_SCRIPT), str(data / "clients"), "--async",
+        "--workers", str(workers), "--sanctions", str(data / "sanctions.txt"), "--output-dir", str(output_dir),
+    ]
+    if short_circuit:
+        command.append("--short-circuit")
+    env = dict(os.environ, AUTOPILOT_CACHE="0", AUTOPILOT_MODE=mode)
+    env.pop("AUTOPILOT_SHORT_CIRCUIT", None)
+    cpu_before = children_cpu()
+    started = time.perf_counter()
+    subprocess.run(command, env=env, check=True, capture_output=True)
+    return {"wall": time.perf_counter() - started, "cpu": children_cpu() - cpu_before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CPU saved by short-circuiting compliance-blocked clients.")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--blocked-rate", type=float, default=0.1)
+    parser.add_argument("--megabytes", type=float, default=2)
+    parser.add_argument("--transactions", type=int, default=200_000)
+    parser.add_argument("--mode", choices=("inprocess", "subprocess"), default="inprocess")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--repeat", type=int, default=1)
+    args = parser.parse_args()
+
+    spec = {
+        "clients": args.clients,
+        "blocked_rate": args.blocked_rate,
+        "megabytes": args.megabytes,
+        "transactions": args.transactions,
+        "seed": SEED,
+    }
+    data = prepare_data(spec)
+    with tempfile.TemporaryDirectory(prefix="bench_short_circuit_") as temp_dir:
+        # Alternate the two settings and keep each one's fastest run.
+        runs = {"full": [], "short": []}
+        for _ in range(max(1, args.repeat)):
+            for label in runs:
+                runs[label].append(run_batch(data, Path(temp_dir) / label, args.mode, args.workers, label == "short"))
+        full, short = (min(runs[label], key=lambda run: run["cpu"]) for label in ("full", "short"))
+
+        blocked, changed = 0, []
+        for path in sorted((Path(temp_dir) / "full").iterdir()):
+            dossier = json.loads((path / "company_dossier.json").read_text(encoding="utf-8"))
+            if dossier.get("credit_decision") == "BLOCKED":
+                blocked += 1
+                continue
+            other = Path(temp_dir) / "short" / path.name / "company_dossier.json"
+            if json.loads(other.read_text(encoding="utf-8")) != dossier:
+                changed.append(path.name)
+
+    saved = full["cpu"] - short["cpu"]
+    print(f"{args.clients} clients, {blocked} blocked ({blocked / args.clients:.0%}), "
+          f"{args.megabytes:g} MB statements, {args.transactions} transactions each, mode {args.mode}")
+    for label, run in (("full pipeline", full), ("short circuit", short)):
+        print(f"{label:14} cpu {run['cpu']:8.3f}s   wall {run['wall']:8.3f}s")
+    print(f"cpu saved: {saved:.3f}s ({saved / full['cpu']:.1%} of the batch"
+          + (f", {saved / blocked:.3f}s per blocked client)" if blocked else ")"))
+    if changed:
+        print(f"unblocked clients differ between runs: {', '.join(changed)}")
+
+
+if __name__ == "__main__":
+    main()
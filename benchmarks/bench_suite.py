@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import argparse
+import copy
+import io
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from bench_sanctions import percentile
+
+ROOT = Path(__file__).resolve().parents[1]
+AUTOPILOT_SCRIPTS = ROOT / "skills" / "commercial-lending-autopilot" / "scripts"
+DATA_DIR = ROOT / ".cache" / "bench"
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+
+SIZES = {
+    "small": {"owners": 100, "megabytes": 1, "transactions": 100_000, "sanctions": 50_000},
+    "medium": {"owners": 1_000, "megabytes": 8, "transactions": 1_000_000, "sanctions": 500_000},
+    "large": {"owners": 10_000, "megabytes": 32, "transactions": 5_000_000, "sanctions": 2_000_000},
+}
+CASES = ["kyb", "compliance", "risk", "sales", "autopilot"]
+SEED = 2024
+
+
+def prepare_data(size: str) -> Path:
+    # Regenerate only when the spec changed; generation dominates small runs.
+    from synth import write_client, write_sanctions
+    import random
+
+    spec = dict(SIZES[size], seed=SEED)
+    directory = DATA_DIR / size
+    marker = directory / "spec.json"
+    if marker.exists() and json.loads(marker.read_text(encoding="utf-8")) == spec:
+        return directory
+    started = time.perf_counter()
+    write_client(directory, SEED, spec["owners"], spec["megabytes"], spec["transactions"])
+    write_sanctions(directory / "sanctions_list.txt", random.Random(SEED + 1), spec["sanctions"])
+    marker.write_text(json.dumps(spec) + "\n", encoding="utf-8")
+    print(f"generated {size} inputs in {time.perf_counter() - started:.1f}s")
+    return directory
+
+
+def peak_rss_kib() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def run_case(case: str, directory: Path, repeat: int) -> dict:
+    """Time one case inside this (fresh) process; the first iteration is the cold run."""
+    sys.path.insert(0, str(AUTOPILOT_SCRIPTS))
+    import run_autopilot
+
+    output_dir = directory / "out"
+    output_dir.mkdir(exist_ok=True)
+    paths = run_autopilot.client_paths(directory, output_dir, directory / "sanctions_list.txt")
+    sizes = {key: Path(paths[key]).stat().st_size for key in ("articles_path", "financials_path", "log_path")}
+    quiet = io.StringIO()
+
+    if case == "autopilot":
+        dossier = {}
+        units, unit = sum(sizes.values()) / 1e6, "MB"
+
+        def call(working):
+            return run_autopilot.run_pipeline(working, paths, "inprocess")
+    else:
+        agent = run_autopilot.load_agent(case)
+        kwargs = run_autopilot.agent_paths(case, paths)
+        dossier = {"entity_name": "Synthetic Holdings LLC"}
+        if case == "compliance":
+            kyb = run_autopilot.load_agent("kyb")
+            dossier = kyb.run({}, articles_path=paths["articles_path"], out=quiet)
+            units, unit = len(dossier.get("ubo_list") or []), "ubos"
+        elif case == "sales":
+            units, unit = SIZES[directory.name]["transactions"], "lines"
+        else:
+            key = "articles_path" if case == "kyb" else "financials_path"
+            units, unit = sizes[key] / 1e6, "MB"
+
+        def call(working):
+            return agent.run(working, out=quiet, **kwargs)
+
+    latencies = []
+    for _ in range(repeat + 1):
+        working = copy.deepcopy(dossier)
+        started = time.perf_counter()
+        call(working)
+        latencies.append(time.perf_counter() - started)
+        quiet.seek(0)
+        quiet.truncate()
+
+    timed = latencies[1:] or latencies
+    p50 = percentile(timed, 50)
+    return {
+        "case": case,
+        "size": directory.name,
+        "units": units,
+        "unit": unit,
+        "first_seconds": latencies[0],
+        "p50_seconds": p50,
+        "p99_seconds": percentile(timed, 99),
+        "throughput": units / p50 if p50 > 0 else None,
+        "peak_rss_kib": peak_rss_kib(),
+    }
+
+
+def spawn_case(case: str, directory: Path, repeat: int) -> dict:
+    env = os.environ.copy()
+    cache_dir = directory / "cache"
+    env.update({
+        "AUTOPILOT_CACHE": "0",
+        "SANCTIONS_CACHE_DIR": str(cache_dir / "sanctions"),
+        "FINANCIALS_CACHE_DIR": str(cache_dir / "financials"),
+    })
+    env.pop("AUTOPILOT_TRACE", None)
+    proc = subprocess.run(
+        [sys.executable, str(Path(__file__)), "--child", case, "--data", str(directory), "--repeat", str(repeat)],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{case} on {directory.name} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results, baseline=None):
+    previous = {(row["case"], row["size"]): row for row in (baseline or {}).get("results", [])}
+    print(f"{'case':<11} {'size':<7} {'throughput':>18} {'first':>9} {'p50':>9} {'p99':>9} {'rss MiB':>8}  vs base")
+    for row in results:
+        old = previous.get((row["case"], row["size"]))
+        delta = f"{old['p50_seconds'] / row['p50_seconds']:.2f}x" if old and row["p50_seconds"] else "-"
+        print(
+            f"{row['case']:<11} {row['size']:<7} {row['throughput']:>12,.1f} {row['unit'] + '/s':<5} "
+            f"{row['first_seconds']:>8.3f}s {row['p50_seconds']:>8.3f}s {row['p99_seconds']:>8.3f}s "
+            f"{row['peak_rss_kib'] / 1024:>8.1f}  {delta}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark every agent and the full autopilot on synthetic inputs.")
+    parser.add_argument("--sizes", default="small,medium", help=f"comma-separated, from {', '.join(SIZES)}")
+    parser.add_argument("--cases", default=",".join(CASES))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, help="results JSON (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=Path, help="earlier results JSON to compare p50 against")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--data", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.child:
+        print(json.dumps(run_case(args.child, args.data, args.repeat)))
+        return
+
+    results = []
+    for size in args.sizes.split(","):
+        directory = prepare_data(size)
+        for case in args.cases.split(","):
+            # One process per case, so peak RSS belongs to that case alone.
+            results.append(spawn_case(case, directory, args.repeat))
+
+    revision = git_revision()
+    report = {
+        "commit": revision,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "sizes": {size: SIZES[size] for size in args.sizes.split(",")},
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+    baseline = json.loads(args.compare.read_text(encoding="utf-8")) if args.compare else None
+    print_results(results, baseline)
+    print(f"results: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import argparse
+import importlib.util
+import random
+import re
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SENTINEL_SCRIPT = ROOT / "skills" / "relationship-sentinel" / "scripts" / "relationship_sentinel.py"
+
+CURRENCIES = ["USD"] * 8 + ["EUR", "GBP", "CAD", "JPY"]
+SOURCES = [
+    "Customer Payment",
+    "Domestic Customer Payment",
+    "VC Funding Round",
+    "Private Equity Investment",
+    "Tenant Rent Collections",
+    "Payroll Refund",
+]
+
+
+def load_sentinel():
+    spec = importlib.util.spec_from_file_location("relationship_sentinel", SENTINEL_SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def synth_lines(rng: random.Random, count: int):
+    return [
+        f"id=TX{index:08d}, amount={rng.randint(100, 3_000_000)}, "
+        f"currency={rng.choice(CURRENCIES)}, source={rng.choice(SOURCES)}"
+        for index in range(count)
+    ]
+
+
+def measure(parse, pool, total: int) -> float:
+    # Cycle a fixed pool so both parsers pay the same loop overhead and the
+    # benchmark does not need to hold `total` lines in memory.
+    size = len(pool)
+    started = time.perf_counter()
+    for index in range(total):
+        parse(pool[index % size])
+    return total / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transaction parser throughput in lines/second.")
+    parser.add_argument("--lines", type=int, default=10_000_000)
+    parser.add_argument("--pool", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+
+    sentinel = load_sentinel()
+    pool = synth_lines(random.Random(args.seed), args.pool)
+
+    def legacy_amount(text):
+        # parse_amount as it was before parse_record: pattern looked up per call.
+        if text is None:
+            return None
+        match = re.search(r"-?\d+(?:\.\d+)?", text.replace(",", "").replace("$", ""))
+        return float(match.group(0)) if match else None
+
+    def legacy(line):
+        # The dict parser plus the per-row decoding detect_signals used to do.
+        tx = sentinel.parse_transaction(line)
+        return sentinel.Transaction(
+            tx.get("id") or tx.get("transaction_id") or tx.get("raw"),
+            legacy_amount(tx.get("amount") or tx.get("transaction_amount")),
+            (tx.get("currency") or "").upper(),
+            (tx.get("source") or "").lower(),
+        )
+
+    mismatches = sum(legacy(line) != sentinel.parse_record(line) for line in pool)
+    print(f"records checked: {len(pool)} mismatches: {mismatches}")
+
+    legacy_rate = measure(legacy, pool, args.lines)
+    print(f"parse_transaction + field decode: {legacy_rate:,.0f} lines/s")
+    record_rate = measure(sentinel.parse_record, pool, args.lines)
+    print(f"parse_record:                     {record_rate:,.0f} lines/s")
+    print(f"speedup: {record_rate / legacy_rate:.2f}x over {args.lines:,} lines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_sanctions import percentile
+
+ROOT = Path(__file__).resolve().parents[1]
+AUTOPILOT_SCRIPTS = ROOT / "skills" / "commercial-lending-autopilot" / "scripts"
+CLIENTS_DIR = ROOT / "docs" / "clients"
+
+
+def wait_for(socket_path: Path, worker, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while not socket_path.exists():
+        if worker.poll() is not None or time.perf_counter() > deadline:
+            sys.exit("worker did not start")
+        time.sleep(0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-job latency: one-shot CLI vs the warm worker.")
+    parser.add_argument("--client", default="greenline-logistics")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(AUTOPILOT_SCRIPTS))
+    import autopilot_worker
+
+    env = dict(os.environ, AUTOPILOT_CACHE="0")
+    with tempfile.TemporaryDirectory(prefix="bench_worker_") as temp_dir:
+        temp = Path(temp_dir)
+        # run_batch.py takes a folder of clients; give it just the one.
+        clients = temp / "clients"
+        clients.mkdir()
+        (clients / args.client).symlink_to(CLIENTS_DIR / args.client)
+        socket_path = temp / "worker.sock"
+
+        one_shot = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(AUTOPILOT_SCRIPTS / "run_batch.py"), str(clients),
+                 "--workers", "1", "--output-dir", str(temp / "cli")],
+                env=env, check=True, capture_output=True,
+            )
+            one_shot.append(time.perf_counter() - started)
+
+        worker = subprocess.Popen(
+            [sys.executable, str(AUTOPILOT_SCRIPTS / "autopilot_worker.py"), "--socket", str(socket_path),
+             "serve", "--workers", "1"],
+            env=env, stdout=subprocess.DEVNULL,
+        )
+        try:
+            wait_for(socket_path, worker)
+            request = {"client_dir": str(clients / args.client), "output_dir": str(temp / "worker")}
+            warm, dispatch = [], []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                events = list(autopilot_worker.submit(request, socket_path))
+                warm.append(time.perf_counter() - started)
+                # Round trip minus the job's own time in the worker.
+                dispatch.append(warm[-1] - events[-1]["seconds"])
+        finally:
+            worker.terminate()
+            worker.wait()
+
+    print(f"client: {args.client}, {args.repeat} jobs each, result cache off")
+    for label, values in (("one-shot CLI", one_shot), ("warm worker", warm), ("worker dispatch", dispatch)):
+        print(f"{label:16} p50 {percentile(values, 50) * 1000:8.2f} ms   p99 {percentile(values, 99) * 1000:8.2f} ms")
+    print(f"speedup (p50): {percentile(one_shot, 50) / percentile(warm, 50):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Seeded synthetic inputs for the benchmark suite.
+
+Each generator writes one agent input file in the same format as the fixtures
+under docs/clients, streaming so that multi-million-line files never have to
+fit in memory.
+"""
+import random
+from pathlib import Path
+
+from bench_financials import synth_statement
+from bench_sanctions import synth_names
+from bench_transaction_parser import CURRENCIES, SOURCES
+
+ROLES = ["CEO", "COO", "CFO", "Managing Member", "Director", "Partner"]
+FILLER_SECTION = "Section {index}. Membership interests are governed by the operating agreement and applicable statutes."
+CHUNK = 100_000
+
+
+def write_articles(path: Path, rng: random.Random, owners: int, sections: int = 200) -> Path:
+    lines = [
+        "ARTICLES OF INCORPORATION",
+        "",
+        "ENTITY NAME: Synthetic Holdings LLC",
+        "STATE OF REGISTRATION: Delaware",
+        "ENTITY TYPE: LLC",
+        "",
+        "MEMBERSHIP AND OWNERSHIP",
+    ]
+    # Ownership above 25% is what KYB keeps; the list is not meant to sum to 100.
+    for name in synth_names(rng, owners):
+        lines.append(f"- {name}, {rng.choice(ROLES)} ({rng.randint(1, 60)}% Ownership)")
+    lines += ["", "GOVERNING PROVISIONS"]
+    lines += [FILLER_SECTION.format(index=index) for index in range(1, sections + 1)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def write_financials(path: Path, rng: random.Random, megabytes: float) -> Path:
+    path.write_text(synth_statement(rng, megabytes, missing=0), encoding="utf-8")
+    return path
+
+
+def write_transactions(path: Path, rng: random.Random, count: int) -> Path:
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("Transaction Stream Log\n")
+        for start in range(0, count, CHUNK):
+            handle.write("".join(
+                f"id=TX{index:09d}, amount={rng.randint(100, 3_000_000)}, "
+                f"currency={rng.choice(CURRENCIES)}, source={rng.choice(SOURCES)}\n"
+                for index in range(start, min(count, start + CHUNK))
+            ))
+    return path
+
+
+def write_sanctions(path: Path, rng: random.Random, count: int) -> Path:
+    with path.open("w", encoding="utf-8") as handle:
+        handle.write("# Synthetic sanctions list (one name per line)\n")
+        for start in range(0, count, CHUNK):
+            handle.write("\n".join(synth_names(rng, min(CHUNK, count - start))) + "\n")
+    return path
+
+
+def write_client(directory: Path, seed: int, owners: int, megabytes: float, transactions: int) -> dict:
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    return {
+        "articles_path": write_articles(directory / "articles_inc.txt", rng, owners),
+        "financials_path": write_financials(directory / "financials.txt", rng, megabytes),
+        "log_path": write_transactions(directory / "bank_statement.txt", rng, transactions),
+    }
@@ -54,9 +54,38 @@ const loadDossier = async () => {
   }
 };
 
+// Write to a temp file, fsync, then rename over the dossier, so a crash or a
+// concurrent reader never sees a half-written file.
 const writeDossier = async (dossier) => {
   await ensureDataDir();
-  await fs.writeFile(DOSSIER_PATH, `${JSON.stringify(dossier, null, 2)}\n`, "utf-8");
+  const tempPath = path.join(DATA_DIR, `.company_dossier.json.${process.pid}.${Date.now()}.tmp`);
+  const handle = await fs.open(tempPath, "w");
+  try {
+    await handle.writeFile(`${JSON.stringify(dossier, null, 2)}\n`, "utf-8");
+    await handle.sync();
+  } finally {
+    await handle.close();
+  }
+  try {
+    await fs.rename(tempPath, DOSSIER_PATH);
+  } catch (err) {
+    await fs.rm(tempPath, { force: true });
+    throw err;
+  }
+};
+
+// Requests are serialized from loading the dossier to writing it back, so two
+// uploads cannot interleave their read-modify-write and drop each other's
+// changes. Resolves to the release function.
+let dossierQueue = Promise.resolve();
+const acquireDossierLock = () => {
+  let release;
+  const held = new Promise((resolve) => {
+    release = resolve;
+  });
+  const acquired = dossierQueue.then(() => release);
+  dossierQueue = acquired.then(() => held);
+  return acquired;
 };
 
 const csvToText = (raw) => {
@@ -436,6 +465,7 @@ app.post(
     { name: "transactions", maxCount: 1 }
   ]),
   async (req, res) => {
+    let releaseDossier = () => {};
     try {
       const files = req.files || {};
       const getFile = (name) => (files[name] && files[name][0] ? files[name][0] : null);
@@ -457,6 +487,7 @@ app.post(
 
       const sanctionsText = await fs.readFile(path.join(DATA_DIR, "sanctions_list.txt"), "utf-8");
 
+      releaseDossier = await acquireDossierLock();
       const dossier = await loadDossier();
 
       // KYB
@@ -661,6 +692,7 @@ app.post(
       await writeDossier(dossier);
       await fs.writeFile(CREDIT_MEMO_PATH, buildCreditMemo(dossier, financials, { ebitda, dscr }), "utf-8");
       await fs.writeFile(SALES_BRIEF_PATH, buildSalesBrief(dossier, signals), "utf-8");
+      releaseDossier();
 
       return res.json({
         ok: true,
@@ -685,6 +717,8 @@ app.post(
       });
     } catch (err) {
       return res.status(500).json({ error: "Server error", detail: err?.message });
+    } finally {
+      releaseDossier();
     }
   }
 );
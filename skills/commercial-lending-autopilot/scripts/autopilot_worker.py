@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Long-running autopilot worker.
+
+``serve`` imports the agents and compiles the sanctions index once, then
+accepts jobs on a local Unix socket and runs them on a bounded thread pool.
+Each connection carries one request, a JSON line:
+
+- ``{"client_dir": ..., "output_dir": ...}`` (optionally ``sanctions_path``)
+  runs the autopilot for that client folder, writing to
+  ``<output_dir>/<client>/`` exactly like ``run_batch.py``;
+- ``{"op": "stats"}`` reports queue depth and job counts.
+
+The worker answers with JSON lines: ``queued``, ``started``, one
+``agent_started``/``agent_finished`` pair per agent, then ``done``, which
+carries ``error`` when the run failed (or ``rejected`` when the queue is
+full, ``error`` for a bad request or an output folder that cannot be written).
+"""
+import argparse
+import itertools
+import json
+import os
+import queue
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from run_autopilot import AGENTS, CACHE_STATS, DEFAULT_PATHS, ROOT, load_agent
+from run_batch import CLIENT_FILES, OUTPUT_DIR, run_client
+
+SOCKET_PATH = Path(os.environ.get("AUTOPILOT_WORKER_SOCKET", ROOT / ".cache" / "autopilot.sock"))
+
+
+class Worker:
+    def __init__(self, workers: int, max_queue: int, sanctions_path: Path):
+        self.workers = workers
+        self.sanctions_path = sanctions_path
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="autopilot-job")
+        # Queued plus running jobs; beyond this, new jobs are turned away
+        # instead of piling up behind a slow backlog.
+        self.slots = threading.BoundedSemaphore(workers + max_queue)
+        self.job_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.counts = {"queued": 0, "running": 0, "done": 0, "failed": 0, "rejected": 0}
+        self.started = time.time()
+
+    def warm(self):
+        for name in AGENTS:
+            load_agent(name)
+        load_agent("compliance").load_sanctions_index(self.sanctions_path)
+
+    def _count(self, key: str, amount: int = 1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def stats(self) -> dict:
+        with self.lock:
+            counts = dict(self.counts)
+        return {
+            "event": "stats",
+            "workers": self.workers,
+            "uptime_seconds": round(time.time() - self.started, 3),
+            "jobs": counts,
+            "cache": dict(CACHE_STATS),
+        }
+
+    def submit(self, request: dict, emit):
+        """Queue one client run; ``emit`` receives its events from the job thread."""
+        client_dir = request.get("client_dir")
+        if not client_dir or not all((Path(client_dir) / name).exists() for name in CLIENT_FILES):
+            emit({"event": "error", "error": f"not a client folder (expected {', '.join(CLIENT_FILES)}): {client_dir}"})
+            return None
+        output_root = Path(request.get("output_dir") or OUTPUT_DIR).resolve()
+        try:
+            (output_root / Path(client_dir).name).mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            emit({"event": "error", "error": f"cannot write to output folder {output_root}: {exc}"})
+            return None
+        if not self.slots.acquire(blocking=False):
+            self._count("rejected")
+            emit({"event": "rejected", "error": "queue full"})
+            return None
+        job = next(self.job_ids)
+        queued_at = time.perf_counter()
+        self._count("queued")
+        emit({"event": "queued", "job": job})
+
+        def run():
+            self._count("queued", -1)
+            self._count("running")
+            try:
+                emit({"event": "started", "job": job, "waited": round(time.perf_counter() - queued_at, 6)})
+                try:
+                    result = run_client(
+                        client_dir,
+                        str(output_root),
+                        request.get("sanctions_path") or str(self.sanctions_path),
+                        "inprocess",
+                        progress=lambda event: emit(dict(event, job=job)),
+                    )
+                except Exception as exc:
+                    # The connection waits for "done"; a job that dies still sends one.
+                    result = {"client": Path(client_dir).name, "error": f"{type(exc).__name__}: {exc}"}
+                self._count("failed" if result["error"] else "done")
+                # Cache and patch counters are process-wide here; see stats.
+                result = {key: value for key, value in result.items() if key not in ("cache", "patch")}
+                emit(dict(result, event="done", job=job))
+            finally:
+                self._count("running", -1)
+                self.slots.release()
+
+        return self.executor.submit(run)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        worker = self.server.worker
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except ValueError:
+            self.send({"event": "error", "error": "expected one JSON request line"})
+            return
+        if request.get("op") == "stats":
+            self.send(worker.stats())
+            return
+        events = queue.Queue()
+        if worker.submit(request, events.put) is None:
+            self.send(events.get())
+            return
+        while True:
+            event = events.get()
+            # A client that hung up stops receiving events; its job still
+            # finishes and writes its output.
+            if not self.send(event) or event["event"] == "done":
+                return
+
+    def send(self, event: dict) -> bool:
+        try:
+            self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+            self.wfile.flush()
+            return True
+        except OSError:
+            return False
+
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def submit(request: dict, socket_path: Path = SOCKET_PATH):
+    """Send one request to a running worker and yield its events."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(str(socket_path))
+        connection.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        with connection.makefile("r", encoding="utf-8") as stream:
+            for line in stream:
+                yield json.loads(line)
+
+
+def serve(args):
+    socket_path = args.socket
+    socket_path.parent.mkdir(parents=True, exist_ok=True)
+    if socket_path.exists():
+        # A live worker still answers; a leftover socket file does not.
+        try:
+            list(submit({"op": "stats"}, socket_path))
+        except OSError:
+            socket_path.unlink()
+        else:
+            sys.exit(f"a worker is already listening on {socket_path}")
+
+    worker = Worker(max(1, args.workers), max(0, args.max_queue), args.sanctions)
+    started = time.perf_counter()
+    worker.warm()
+    print(f"Agents and sanctions index warm in {time.perf_counter() - started:.3f}s", flush=True)
+
+    server = Server(str(socket_path), Handler)
+    server.worker = worker
+    # shutdown() waits for serve_forever to return, so call it off the main thread.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    print(f"Listening on {socket_path} with {worker.workers} workers", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        worker.executor.shutdown(wait=True)
+        if socket_path.exists():
+            socket_path.unlink()
+
+
+def submit_command(args):
+    request = {"client_dir": str(args.client_dir.resolve()), "output_dir": str(args.output_dir.resolve())}
+    failed = False
+    for event in submit(request, args.socket):
+        print(json.dumps(event), flush=True)
+        failed = event["event"] in ("error", "rejected") or bool(event.get("error"))
+    sys.exit(1 if failed else 0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Keep the autopilot warm and run client jobs sent over a local socket.")
+    parser.add_argument("--socket", type=Path, default=SOCKET_PATH)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = commands.add_parser("serve", help="run the worker")
+    serve_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    serve_parser.add_argument("--max-queue", type=int, default=64)
+    serve_parser.add_argument("--sanctions", type=Path, default=DEFAULT_PATHS["sanctions_path"])
+    serve_parser.set_defaults(handler=serve)
+
+    submit_parser = commands.add_parser("submit", help="run one client folder on a running worker")
+    submit_parser.add_argument("client_dir", type=Path)
+    submit_parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    submit_parser.set_defaults(handler=submit_command)
+
+    stats_parser = commands.add_parser("stats", help="print a running worker's counters")
+    stats_parser.set_defaults(handler=lambda args: print(json.dumps(next(submit({"op": "stats"}, args.socket)))))
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,153 @@
 #!/usr/bin/env python3
+import asyncio
+import copy
+import hashlib
+import importlib.util
+import io
 import json
 import os
 import shutil
 import subprocess
+import sys
 import tempfile
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[3]
 DOSSIER_PATH = ROOT / "company_dossier.json"
-
+SAVE_ATTEMPTS = 3
+SHARED_DIR = ROOT / "skills" / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+import instrumentation  # noqa: E402
+import dossier_patch  # noqa: E402
+import dossier_store  # noqa: E402
+import cancellation  # noqa: E402
+
+# "inprocess" imports each agent once and calls its run() on a dossier dict;
+# "subprocess" keeps one interpreter per agent for isolation.
+EXECUTION_MODE = os.environ.get("AUTOPILOT_MODE", "inprocess")
+
+# Agent results are cached by a hash of everything they depend on; a hit
+# replays the stored dossier patch and artifacts instead of running the agent.
+CACHE_ENABLED = os.environ.get("AUTOPILOT_CACHE", "1") == "1"
+CACHE_DIR = Path(os.environ.get("AUTOPILOT_CACHE_DIR", ROOT / ".cache" / "agents"))
+CACHE_MAX_BYTES = int(float(os.environ.get("AUTOPILOT_CACHE_MAX_MB", "64")) * 1024 * 1024)
+CACHE_VERSION = 4
+
+# "paths" maps each run() keyword argument to the env var the script reads
+# the same path from when it runs as a subprocess; "inputs" are the ones it
+# reads (the rest are artifacts it writes). "reads"/"writes" list the dossier
+# fields the agent looks at and changes; the scheduler orders agents by them.
+# "cache_inputs" are the fields a stateless run is handed and keyed on: its
+# reads minus the outputs it only extends or replaces, which the patch merge
+# reconciles, so a re-run over its own saved dossier is a cache hit. KYB keeps
+# entity_name and state because an inferred value never overrides one on
+# file. "derived" names, per cache input, the sub-keys the agent recomputes;
+# they are stripped from its input and key, and the rest (a proposed loan
+# amount in financials) pass through. "state" paths hold run state (the
+# sentinel checkpoint) and are never cached or replayed.
+# "config" names the env vars that change its output, with a default path
+# when the value names a file whose contents matter. "no_cache" env vars make
+# a run stateful or read files the key cannot see, so it is never cached.
 AGENTS = {
     "kyb": {
         "script": ROOT / "skills" / "kyb-gatekeeper" / "scripts" / "kyb_extract.py",
+        "paths": {"articles_path": "KYB_ARTICLES_PATH"},
+        "inputs": ["articles_path"],
+        "reads": ["entity_name", "state", "regulatory_flags"],
+        "cache_inputs": ["entity_name", "state"],
+        "writes": ["entity_name", "state", "ubo_list", "kyb_status", "regulatory_flags"],
+        "config": {},
+        "no_cache": ["KYB_RELATED_ARTICLES"],
     },
     "compliance": {
         "script": ROOT / "skills" / "regulatory-shield" / "scripts" / "regulatory_screen.py",
+        "paths": {"sanctions_path": "SANCTIONS_PATH"},
+        "inputs": ["sanctions_path"],
+        "reads": ["ubo_list", "regulatory_flags", "business_type", "industry"],
+        "cache_inputs": ["ubo_list", "business_type", "industry"],
+        "writes": ["regulatory_flags", "compliance_summary", "credit_decision"],
+        "config": {"SANCTIONS_FUZZY_THRESHOLD": None},
     },
     "risk": {
         "script": ROOT / "skills" / "credit-underwriter" / "scripts" / "underwrite.py",
+        "paths": {"financials_path": "FINANCIALS_PATH", "memo_path": "CREDIT_MEMO_PATH"},
+        "inputs": ["financials_path"],
+        "reads": ["regulatory_flags", "financials", "entity_name", "industry"],
+        "cache_inputs": ["regulatory_flags", "financials", "entity_name", "industry"],
+        # Mirrors underwrite.DERIVED_FIELDS.
+        "derived": {
+            "financials": [
+                "gross_revenue", "operating_expenses", "depreciation", "annual_debt_service",
+                "ebitda", "dscr", "period", "periods", "by_period", "trailing_dscr",
+                "average_dscr", "revenue_growth", "ebitda_growth", "revenue_cagr",
+            ],
+        },
+        "writes": ["financials", "credit_decision"],
+        "config": {},
     },
     "sales": {
         "script": ROOT / "skills" / "relationship-sentinel" / "scripts" / "relationship_sentinel.py",
+        "paths": {
+            "log_path": "TRANSACTION_LOG_PATH",
+            "brief_path": "SALES_BRIEF_PATH",
+            "checkpoint_path": "SENTINEL_CHECKPOINT_PATH",
+        },
+        "inputs": ["log_path"],
+        "state": ["checkpoint_path"],
+        "reads": ["cross_sell_opportunities", "entity_name", "industry"],
+        "cache_inputs": ["entity_name", "industry"],
+        "writes": ["cross_sell_opportunities"],
+        "config": {
+            "SENTINEL_RULES_PATH": ROOT / "skills" / "relationship-sentinel" / "signal_rules.json",
+            "SENTINEL_BATCH": None,
+        },
+        "no_cache": ["SENTINEL_INCREMENTAL", "SENTINEL_FOLLOW"],
     },
 }
 
+# Underwriting reads the flags only for the CRITICAL -> BLOCKED override,
+# which enforce_overrides reapplies after every merge, so it does not wait
+# for compliance.
+RECONCILED_FIELDS = {"regulatory_flags"}
+
+# AUTOPILOT_ORCHESTRATOR=async runs the DAG on an event loop, with a deadline
+# per agent (AUTOPILOT_AGENT_TIMEOUT, or AUTOPILOT_TIMEOUT_<AGENT>) and
+# cancellation; see run_pipeline_async. AUTOPILOT_SHORT_CIRCUIT=1 stops
+# underwriting and sales once compliance blocks the deal, and implies it.
+SHORT_CIRCUIT = os.environ.get("AUTOPILOT_SHORT_CIRCUIT") == "1"
+ORCHESTRATOR = os.environ.get("AUTOPILOT_ORCHESTRATOR", "async" if SHORT_CIRCUIT else "threads")
+DEFAULT_TIMEOUT = float(os.environ.get("AUTOPILOT_AGENT_TIMEOUT", "300"))
+TIMEOUTS = {
+    name: float(os.environ.get(f"AUTOPILOT_TIMEOUT_{name.upper()}", DEFAULT_TIMEOUT)) for name in AGENTS
+}
+# How long a cancelled in-process agent gets to notice its stop event before
+# it is abandoned.
+STOP_GRACE = 5.0
+
+
+def is_critical(dossier: dict) -> bool:
+    flags = dossier.get("regulatory_flags") or []
+    return isinstance(flags, list) and "CRITICAL" in flags
+
+
+# Agent -> (test on the dossier after its merge, agents it halts when true).
+HALTS = {"compliance": (is_critical, ["risk", "sales"])}
+
+DEFAULT_PATHS = {
+    "articles_path": ROOT / "docs" / "articles_inc.txt",
+    "sanctions_path": ROOT / "data" / "sanctions_list.txt",
+    "financials_path": ROOT / "docs" / "financials.txt",
+    "memo_path": ROOT / "Credit_Memo.md",
+    "log_path": ROOT / "logs" / "transaction_stream.log",
+    "brief_path": ROOT / "Sales_Brief.md",
+    "checkpoint_path": DOSSIER_PATH.with_suffix(".sentinel.json"),
+}
+
 WORKTREES = {
     "kyb": ROOT / "kyb",
     "compliance": ROOT / "compliance",
@@ -43,87 +166,322 @@ def write_json(path: Path, data: dict) -> None:
     path.write_text(json.dumps(data, indent=2) + "\n", encoding="utf-8")
 
 
+def read_state(path: Path):
+    return path.read_text(encoding="utf-8") if path.exists() else None
+
+
+def restore_state(path: Path, content):
+    if content is None:
+        path.unlink(missing_ok=True)
+    else:
+        dossier_store.write_atomic(path, content)
+
+
 def ensure_worktrees():
     for path in WORKTREES.values():
         path.mkdir(parents=True, exist_ok=True)
 
 
-def run_agent(name: str, script: Path, dossier_path: Path):
+_loaded_agents = {}
+_load_lock = threading.Lock()
+
+
+def load_agent(name: str):
+    with _load_lock:
+        module = _loaded_agents.get(name)
+        if module is None:
+            script = AGENTS[name]["script"]
+            spec = importlib.util.spec_from_file_location(f"autopilot_agent_{name}", script)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _loaded_agents[name] = module
+        return module
+
+
+def client_paths(client_dir: Path, output_dir: Path, sanctions_path: Path = DEFAULT_PATHS["sanctions_path"]) -> dict:
+    return {
+        "articles_path": client_dir / "articles_inc.txt",
+        "sanctions_path": sanctions_path,
+        "financials_path": client_dir / "financials.txt",
+        "memo_path": output_dir / "Credit_Memo.md",
+        "log_path": client_dir / "bank_statement.txt",
+        "brief_path": output_dir / "Sales_Brief.md",
+        "checkpoint_path": output_dir / "company_dossier.sentinel.json",
+    }
+
+
+def agent_paths(name: str, paths: dict) -> dict:
+    return {key: Path(paths[key]) for key in AGENTS[name]["paths"] if key in paths}
+
+
+def stateful(name: str) -> bool:
+    return any(os.environ.get(var) not in (None, "", "0") for var in AGENTS[name].get("no_cache", []))
+
+
+def cache_input(name: str, dossier: dict) -> dict:
+    agent = AGENTS[name]
+    fields = {}
+    for key in agent["cache_inputs"]:
+        if key not in dossier:
+            continue
+        value = dossier[key]
+        derived = agent.get("derived", {}).get(key)
+        if derived and isinstance(value, dict):
+            value = {sub: item for sub, item in value.items() if sub not in derived}
+            if not value:
+                # Nothing but recomputed figures: the same as a first run.
+                continue
+        fields[key] = value
+    return fields
+
+
+def agent_input(name: str, dossier: dict) -> dict:
+    # Agents only see the fields they declare reading; a stateless run sees
+    # just its cache inputs, so its patch never depends on what it wrote before.
+    if stateful(name):
+        return {key: dossier[key] for key in AGENTS[name]["reads"] if key in dossier}
+    return cache_input(name, dossier)
+
+
+# Bytes of dossier JSON exchanged with subprocess agents, and, when tracing is
+# on (instrumentation.ENABLED), what handing each one the full dossier and
+# reading its full rewrite back would have cost. Working that out serialises
+# and copies the whole dossier, the very cost patches avoid, so a normal run
+# only counts what it wrote.
+PATCH_STATS = {"written_bytes": 0, "avoided_bytes": 0}
+_patch_lock = threading.Lock()
+
+
+def prepare_subprocess(name: str, dossier: dict, temp_dir: Path, paths: dict) -> dict:
+    """Write the agent's input and return its command line and environment."""
+    dossier_path = temp_dir / f"{name}_dossier.json"
+    patch_path = temp_dir / f"{name}_patch.json"
+    payload = dossier_patch.encode(agent_input(name, dossier))
+    dossier_path.write_text(payload, encoding="utf-8")
     env = os.environ.copy()
     env["DOSSIER_PATH"] = str(dossier_path)
+    env["DOSSIER_PATCH_PATH"] = str(patch_path)
+    for key, value in agent_paths(name, paths).items():
+        env[AGENTS[name]["paths"][key]] = str(value)
+    return {
+        "args": ["python3", str(AGENTS[name]["script"])],
+        "env": env,
+        "patch_path": patch_path,
+        "payload": payload,
+    }
+
+
+def subprocess_result(name: str, dossier: dict, prepared: dict, returncode: int, stdout: str, stderr: str) -> dict:
+    patch_path = prepared["patch_path"]
+    patch = []
+    if returncode == 0 and patch_path.exists():
+        encoded = patch_path.read_text(encoding="utf-8")
+        patch = json.loads(encoded)
+        written = len(prepared["payload"]) + len(encoded)
+        avoided = 0
+        if instrumentation.ENABLED:
+            full = len(json.dumps(dossier, indent=2)) + 1
+            rewritten = len(json.dumps(dossier_patch.apply_patch(copy.deepcopy(dossier), patch), indent=2)) + 1
+            avoided = full + rewritten - written
+        with _patch_lock:
+            PATCH_STATS["written_bytes"] += written
+            PATCH_STATS["avoided_bytes"] += avoided
+    return {
+        "name": name,
+        "returncode": returncode,
+        "stdout": stdout.strip(),
+        "stderr": stderr.strip(),
+        "patch": patch,
+    }
+
+
+def run_agent_subprocess(name: str, dossier: dict, temp_dir: Path, paths: dict):
+    prepared = prepare_subprocess(name, dossier, temp_dir, paths)
     proc = subprocess.run(
-        ["python3", str(script)],
+        prepared["args"],
         cwd=str(ROOT),
-        env=env,
+        env=prepared["env"],
         capture_output=True,
         text=True,
     )
+    return subprocess_result(name, dossier, prepared, proc.returncode, proc.stdout, proc.stderr)
+
+
+def run_agent_inprocess(name: str, dossier: dict, paths: dict, stop: threading.Event = None):
+    out = io.StringIO()
+    before = agent_input(name, dossier)
+    working = copy.deepcopy(before)
+    try:
+        with instrumentation.agent(name), cancellation.scope(stop):
+            with instrumentation.stage("import"):
+                module = load_agent(name)
+            result = module.run(working, out=out, **agent_paths(name, paths))
+            patch = dossier_patch.make_patch(before, result, module.PATCH_OPS)
+        returncode = 0
+        stderr = ""
+    except Exception:
+        # Mirror a failed subprocess: nothing of the agent's work is merged.
+        patch = []
+        returncode = 1
+        stderr = traceback.format_exc()
     return {
         "name": name,
-        "returncode": proc.returncode,
-        "stdout": proc.stdout.strip(),
-        "stderr": proc.stderr.strip(),
-        "dossier_path": dossier_path,
+        "returncode": returncode,
+        "stdout": out.getvalue().strip(),
+        "stderr": stderr.strip(),
+        "patch": patch,
     }
 
 
-def merge_flags(target: dict, source_flags):
-    if not isinstance(source_flags, list):
-        return
-    target_flags = target.get("regulatory_flags")
-    if not isinstance(target_flags, list):
-        target_flags = []
-    for flag in source_flags:
-        if flag not in target_flags:
-            target_flags.append(flag)
-    target["regulatory_flags"] = target_flags
+CACHE_STATS = {"hits": 0, "misses": 0}
+_cache_lock = threading.Lock()
+_digest_memo = {}
 
 
-def merge_cross_sell(target: dict, source_list):
-    if not isinstance(source_list, list):
-        return
-    existing = target.get("cross_sell_opportunities")
-    if not isinstance(existing, list):
-        existing = []
-    existing.extend(source_list)
-    target["cross_sell_opportunities"] = existing
+def file_digest(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        hasher = hashlib.sha256()
+        with path.open("rb") as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                hasher.update(chunk)
+        digest = _digest_memo[memo_key] = hasher.hexdigest()
+    return digest
+
+
+def cache_key(name: str, dossier: dict, paths: dict):
+    agent = AGENTS[name]
+    if stateful(name):
+        return None
+    fields = cache_input(name, dossier)
+    config = {}
+    for var, default in agent["config"].items():
+        value = os.environ.get(var)
+        config[var] = file_digest(Path(value or default)) if default is not None else value
+    material = {
+        "version": CACHE_VERSION,
+        "agent": name,
+        # The script and every module it can import from its own or the shared directory.
+        "scripts": {
+            str(path.relative_to(ROOT)): file_digest(path)
+            for directory in (agent["script"].parent, SHARED_DIR)
+            for path in sorted(directory.glob("*.py"))
+        },
+        "inputs": {key: file_digest(Path(paths[key])) for key in agent["inputs"] if key in paths},
+        "fields": {key: fields.get(key) for key in agent["cache_inputs"]},
+        "config": config,
+    }
+    encoded = json.dumps(material, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def cache_lookup(name: str, key: str, paths: dict):
+    entry_path = CACHE_DIR / f"{key}.json"
+    try:
+        entry = json.loads(entry_path.read_text(encoding="utf-8"))
+        os.utime(entry_path)  # recency for LRU eviction
+    except (OSError, ValueError):
+        return None
+
+    for kwarg, content in entry["artifacts"].items():
+        target = Path(paths[kwarg])
+        # Unchanged artifacts are left alone rather than rewritten.
+        if not target.exists() or target.read_text(encoding="utf-8") != content:
+            target.write_text(content, encoding="utf-8")
+    return {
+        "name": name,
+        "returncode": 0,
+        "stdout": entry["stdout"],
+        "stderr": "",
+        "patch": entry["patch"],
+        "cached": True,
+    }
 
 
-def merge_kyb(base: dict, kyb: dict):
-    for key in ("entity_name", "state", "ubo_list", "kyb_status"):
-        if key in kyb:
-            base[key] = kyb[key]
-    merge_flags(base, kyb.get("regulatory_flags"))
+def cache_store(name: str, key: str, result: dict, paths: dict):
+    artifacts = {}
+    agent = AGENTS[name]
+    for kwarg in agent["paths"]:
+        if kwarg in agent["inputs"] or kwarg in agent.get("state", []) or kwarg not in paths:
+            continue
+        target = Path(paths[kwarg])
+        if target.exists():
+            artifacts[kwarg] = target.read_text(encoding="utf-8")
+    entry = {
+        "patch": result["patch"],
+        "artifacts": artifacts,
+        "stdout": result["stdout"],
+    }
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=CACHE_DIR, prefix=key, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(entry, handle)
+        os.replace(temp_name, CACHE_DIR / f"{key}.json")
+        evict_cache()
+    except OSError:
+        pass
+
+
+def evict_cache(max_bytes: int = CACHE_MAX_BYTES):
+    entries = []
+    for path in CACHE_DIR.glob("*.json"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+
+
+def run_agent(name: str, dossier: dict, temp_dir: Path, paths: dict, mode: str = EXECUTION_MODE):
+    key = cache_key(name, dossier, paths) if CACHE_ENABLED else None
+    if key is not None:
+        cached = cache_lookup(name, key, paths)
+        with _cache_lock:
+            CACHE_STATS["hits" if cached else "misses"] += 1
+        if cached:
+            return cached
+
+    if mode == "subprocess":
+        result = run_agent_subprocess(name, dossier, temp_dir, paths)
+    elif mode == "inprocess":
+        result = run_agent_inprocess(name, dossier, paths)
+    else:
+        raise ValueError(f"unknown execution mode: {mode}")
+
+    if key is not None and result["returncode"] == 0:
+        cache_store(name, key, result, paths)
+    return result
 
 
-def merge_compliance(base: dict, compliance: dict):
-    merge_flags(base, compliance.get("regulatory_flags"))
-    if "compliance_summary" in compliance:
-        base["compliance_summary"] = compliance["compliance_summary"]
-    if compliance.get("credit_decision") == "BLOCKED":
+def enforce_overrides(base: dict):
+    if is_critical(base):
         base["credit_decision"] = "BLOCKED"
 
 
-def merge_risk(base: dict, risk: dict):
-    if "financials" in risk:
-        base["financials"] = risk["financials"]
-    if "credit_decision" in risk:
-        base["credit_decision"] = risk["credit_decision"]
+def write_blocked_artifacts(dossier: dict, paths: dict):
+    # A short-circuited deal gets the blocked memo in place of underwriting's,
+    # and no sales brief for a client the bank cannot serve.
+    Path(paths["memo_path"]).write_text(load_agent("risk").build_blocked_memo(dossier), encoding="utf-8")
+    Path(paths["brief_path"]).unlink(missing_ok=True)
 
 
-def merge_sales(base: dict, sales: dict):
-    merge_cross_sell(base, sales.get("cross_sell_opportunities"))
-
-
-def enforce_overrides(base: dict):
-    flags = base.get("regulatory_flags") or []
-    if isinstance(flags, list) and "CRITICAL" in flags:
-        base["credit_decision"] = "BLOCKED"
-
-
-def copy_artifacts():
-    credit_src = ROOT / "Credit_Memo.md"
-    sales_src = ROOT / "Sales_Brief.md"
+def copy_artifacts(paths: dict = DEFAULT_PATHS):
+    credit_src = paths["memo_path"]
+    sales_src = paths["brief_path"]
 
     if credit_src.exists():
         shutil.copyfile(credit_src, WORKTREES["risk"] / "Credit_Memo.md")
@@ -131,69 +489,386 @@ def copy_artifacts():
         shutil.copyfile(sales_src, WORKTREES["sales"] / "Sales_Brief.md")
 
 
-def main():
-    ensure_worktrees()
-
-    base_dossier = load_json(DOSSIER_PATH)
+def agent_dependencies(names=tuple(AGENTS)) -> dict:
+    # An agent waits for every earlier agent that writes a field it reads.
+    dependencies = {}
+    for index, name in enumerate(names):
+        reads = set(AGENTS[name]["reads"]) - RECONCILED_FIELDS
+        dependencies[name] = [
+            earlier for earlier in names[:index] if reads & set(AGENTS[earlier]["writes"])
+        ]
+    return dependencies
+
+
+def critical_path(dependencies: dict, timeline: dict):
+    # Longest chain of agent durations through the DAG (names are in topological order).
+    best = {}
+    for name, parents in dependencies.items():
+        duration = timeline[name]["finish"] - timeline[name]["start"]
+        previous = max((best[parent] for parent in parents), key=lambda item: item[0], default=(0.0, []))
+        best[name] = (previous[0] + duration, previous[1] + [name])
+    return max(best.values(), key=lambda item: item[0], default=(0.0, []))
+
+
+def run_pipeline(
+    base_dossier: dict,
+    paths: dict = DEFAULT_PATHS,
+    mode: str = EXECUTION_MODE,
+    timeline: dict = None,
+    progress=None,
+) -> dict:
+    """Run the agents as a DAG derived from their reads/writes declarations.
+
+    Each agent starts as soon as the agents it depends on have been merged,
+    on a snapshot of the dossier at that point; results are merged in
+    declaration order as they become available. When ``timeline`` is given it receives per-agent start/finish
+    offsets, dependencies, and the critical path. ``progress``, if given, is
+    called with an ``agent_started`` / ``agent_finished`` event dict as each
+    agent starts and finishes.
+    """
+    dependencies = agent_dependencies()
+    order = list(dependencies)
+    nodes = {}
+    merged = base_dossier
+    started = time.perf_counter()
 
     with tempfile.TemporaryDirectory(prefix="autopilot_") as temp_dir:
         temp_dir_path = Path(temp_dir)
+        pending = dict(dependencies)
+        running = {}
+        results = {}
+        merged_count = 0
+        with ThreadPoolExecutor(max_workers=len(dependencies)) as executor:
+            while pending or running:
+                done = set(order[:merged_count])
+                ready = [name for name, parents in pending.items() if done.issuperset(parents)]
+                # Agents only read their snapshot (run_agent copies before mutating),
+                # so everything that becomes ready together can share one.
+                snapshot = copy.deepcopy(merged) if ready else None
+                for name in ready:
+                    del pending[name]
+                    nodes[name] = {"start": time.perf_counter() - started, "after": dependencies[name]}
+                    running[executor.submit(run_agent, name, snapshot, temp_dir_path, paths, mode)] = name
+                    if progress is not None:
+                        progress({"event": "agent_started", "agent": name})
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    nodes[name]["finish"] = time.perf_counter() - started
+                    results[name] = future.result()
+                    if progress is not None:
+                        progress({
+                            "event": "agent_finished",
+                            "agent": name,
+                            "returncode": results[name]["returncode"],
+                            "seconds": round(nodes[name]["finish"] - nodes[name]["start"], 6),
+                        })
+                # Merge in declaration order, whatever order agents finish in,
+                # so the merged dossier (down to key order) is deterministic.
+                while merged_count < len(order) and order[merged_count] in results:
+                    name = order[merged_count]
+                    result = results.pop(name)
+                    if result["returncode"] != 0:
+                        print(f"{name} failed: {result['stderr'] or result['stdout']}")
+                    with instrumentation.stage("merge"):
+                        dossier_patch.apply_patch(merged, result["patch"])
+                    merged_count += 1
+
+    enforce_overrides(merged)
+
+    if timeline is not None:
+        length, path = critical_path(dependencies, nodes)
+        timeline["nodes"] = nodes
+        timeline["critical_path"] = path
+        timeline["critical_path_seconds"] = length
+        timeline["wall_seconds"] = time.perf_counter() - started
+    return merged
+
+
+def unfinished_result(name: str, status: str, reason: str) -> dict:
+    return {"name": name, "returncode": 1, "stdout": "", "stderr": reason, "patch": [], "status": status}
+
+
+async def run_agent_subprocess_async(name: str, dossier: dict, temp_dir: Path, paths: dict):
+    prepared = prepare_subprocess(name, dossier, temp_dir, paths)
+    proc = await asyncio.create_subprocess_exec(
+        *prepared["args"],
+        cwd=str(ROOT),
+        env=prepared["env"],
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    try:
+        stdout, stderr = await proc.communicate()
+    except asyncio.CancelledError:
+        # Deadlines arrive as cancellation too.
+        proc.kill()
+        await proc.wait()
+        raise
+    return subprocess_result(
+        name, dossier, prepared, proc.returncode,
+        stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace"),
+    )
+
 
-        # Run KYB first so compliance has UBOs to screen.
-        kyb_path = temp_dir_path / "kyb_dossier.json"
-        write_json(kyb_path, base_dossier)
-        kyb_result = run_agent("kyb", AGENTS["kyb"]["script"], kyb_path)
-        if kyb_result["returncode"] != 0:
-            print(f"kyb failed: {kyb_result['stderr'] or kyb_result['stdout']}")
-        merge_kyb(base_dossier, load_json(kyb_path))
-
-        # Run remaining agents in parallel.
-        dossier_paths = {}
-        for name in ("compliance", "risk", "sales"):
-            temp_path = temp_dir_path / f"{name}_dossier.json"
-            write_json(temp_path, base_dossier)
-            dossier_paths[name] = temp_path
-
-        with ThreadPoolExecutor(max_workers=3) as executor:
-            futures = []
-            for name in ("compliance", "risk", "sales"):
-                futures.append(
-                    executor.submit(run_agent, name, AGENTS[name]["script"], dossier_paths[name])
+async def run_agent_inprocess_async(name: str, dossier: dict, paths: dict, stop: threading.Event):
+    future = asyncio.get_running_loop().run_in_executor(None, run_agent_inprocess, name, dossier, paths, stop)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Ask the thread to stop and let it unwind, so it does not write
+        # artifacts after the pipeline has moved on.
+        stop.set()
+        await asyncio.wait({future}, timeout=STOP_GRACE)
+        raise
+
+
+async def run_agent_async(
+    name: str,
+    dossier: dict,
+    temp_dir: Path,
+    paths: dict,
+    mode: str = EXECUTION_MODE,
+    stop: threading.Event = None,
+):
+    key = cache_key(name, dossier, paths) if CACHE_ENABLED else None
+    if key is not None:
+        cached = cache_lookup(name, key, paths)
+        with _cache_lock:
+            CACHE_STATS["hits" if cached else "misses"] += 1
+        if cached:
+            return cached
+
+    if mode == "subprocess":
+        result = await run_agent_subprocess_async(name, dossier, temp_dir, paths)
+    elif mode == "inprocess":
+        result = await run_agent_inprocess_async(name, dossier, paths, stop or threading.Event())
+    else:
+        raise ValueError(f"unknown execution mode: {mode}")
+
+    if key is not None and result["returncode"] == 0:
+        cache_store(name, key, result, paths)
+    return result
+
+
+async def run_pipeline_async(
+    base_dossier: dict,
+    paths: dict = DEFAULT_PATHS,
+    mode: str = EXECUTION_MODE,
+    timeline: dict = None,
+    progress=None,
+    limiter: asyncio.Semaphore = None,
+    short_circuit: bool = SHORT_CIRCUIT,
+) -> dict:
+    """Run the agents as ``run_pipeline`` does, on an event loop.
+
+    Each agent has a deadline (``TIMEOUTS``); an overrunning subprocess is
+    killed. An agent that fails or times out cancels the agents depending on
+    it. With ``short_circuit``, a CRITICAL compliance result cancels the
+    agents in ``HALTS``, and a blocked memo replaces their artifacts.
+    In-process agents are stopped cooperatively (see ``cancellation``).
+    Pass one ``limiter`` to every pipeline to bound the agents running at
+    once across clients. Timeline nodes also carry each agent's ``status``
+    (ok, failed, timeout or cancelled); only ok agents are merged.
+    """
+    dependencies = agent_dependencies()
+    order = list(dependencies)
+    dependents = {name: [other for other in order if name in dependencies[other]] for name in order}
+    limiter = limiter or asyncio.Semaphore(len(order))
+    merged = base_dossier
+    nodes = {name: {"after": dependencies[name]} for name in order}
+    merged_events = {name: asyncio.Event() for name in order}
+    cancelled = {}
+    stops = {name: threading.Event() for name in order}
+    halted = []
+    started = time.perf_counter()
+
+    def report(event: dict):
+        if progress is not None:
+            progress(event)
+
+    async def node(name: str, temp_dir: Path):
+        for parent in dependencies[name]:
+            await merged_events[parent].wait()
+        async with limiter:
+            nodes[name]["start"] = time.perf_counter() - started
+            report({"event": "agent_started", "agent": name})
+            try:
+                result = await asyncio.wait_for(
+                    run_agent_async(name, copy.deepcopy(merged), temp_dir, paths, mode, stops[name]),
+                    TIMEOUTS[name],
                 )
+                result.setdefault("status", "ok" if result["returncode"] == 0 else "failed")
+            except asyncio.TimeoutError:
+                result = unfinished_result(name, "timeout", f"timed out after {TIMEOUTS[name]:g}s")
+            finally:
+                nodes[name]["finish"] = time.perf_counter() - started
+        report({
+            "event": "agent_finished",
+            "agent": name,
+            "status": result["status"],
+            "seconds": round(nodes[name]["finish"] - nodes[name]["start"], 6),
+        })
+        return result
+
+    def cancel(name: str, reason: str):
+        if name in cancelled:
+            return
+        cancelled[name] = reason
+        stops[name].set()
+        tasks[name].cancel()
+        for dependent in dependents[name]:
+            cancel(dependent, reason)
 
-        results = [future.result() for future in futures]
-        for result in results:
-            if result["returncode"] != 0:
-                print(f"{result['name']} failed: {result['stderr'] or result['stdout']}")
+    with tempfile.TemporaryDirectory(prefix="autopilot_") as temp_dir:
+        tasks = {name: asyncio.ensure_future(node(name, Path(temp_dir))) for name in order}
+        try:
+            # Merge in declaration order, like run_pipeline, so the dossier is
+            # deterministic whichever agent finishes first.
+            for name in order:
+                task = tasks[name]
+                await asyncio.wait({task})
+                if name in cancelled:
+                    # A result that finished before the halt is dropped too.
+                    result = unfinished_result(name, "cancelled", cancelled[name])
+                    now = time.perf_counter() - started
+                    nodes[name].setdefault("start", now)
+                    nodes[name]["finish"] = nodes[name].get("finish", now)
+                    report({"event": "agent_cancelled", "agent": name, "reason": cancelled[name]})
+                else:
+                    result = task.result()
+                nodes[name]["status"] = result["status"]
+                if result["status"] in ("failed", "timeout"):
+                    print(f"{name} {result['status']}: {result['stderr'] or result['stdout']}")
+                    for dependent in dependents[name]:
+                        cancel(dependent, f"{name} {result['status']}")
+                elif result["status"] == "ok":
+                    with instrumentation.stage("merge"):
+                        dossier_patch.apply_patch(merged, result["patch"])
+                    test, targets = HALTS.get(name, (None, []))
+                    if short_circuit and test is not None and test(merged):
+                        for target in targets:
+                            cancel(target, f"{name}: CRITICAL")
+                            halted.append(target)
+                merged_events[name].set()
+        finally:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+
+    enforce_overrides(merged)
+    if halted:
+        write_blocked_artifacts(merged, paths)
+
+    if timeline is not None:
+        length, path = critical_path(dependencies, nodes)
+        timeline["nodes"] = nodes
+        timeline["halted"] = halted
+        timeline["critical_path"] = path
+        timeline["critical_path_seconds"] = length
+        timeline["wall_seconds"] = time.perf_counter() - started
+    return merged
+
+
+def dossier_status(dossier: dict) -> dict:
+    compliance_status = (
+        dossier.get("compliance_summary", {}).get("status")
+        if isinstance(dossier.get("compliance_summary"), dict)
+        else "UNKNOWN"
+    )
+    return {
+        "kyb_status": dossier.get("kyb_status", "UNKNOWN"),
+        "compliance_status": compliance_status,
+        "credit_decision": dossier.get("credit_decision", "UNKNOWN"),
+        "cross_sell": len(dossier.get("cross_sell_opportunities") or []),
+    }
 
-        merged = base_dossier
 
-        merge_compliance(merged, load_json(dossier_paths["compliance"]))
-        merge_risk(merged, load_json(dossier_paths["risk"]))
-        merge_sales(merged, load_json(dossier_paths["sales"]))
+def format_patch_stats(stats: dict) -> str:
+    line = f"{stats['written_bytes']} bytes of inputs and patches"
+    if stats["avoided_bytes"]:
+        line += f", {stats['avoided_bytes']} bytes of full-dossier copies avoided"
+    return line
 
-        enforce_overrides(merged)
-        write_json(DOSSIER_PATH, merged)
 
-    copy_artifacts()
+def record_timeline(scope, timeline: dict):
+    # Wall time per agent as the orchestrator saw it, including subprocess
+    # startup and cache lookups.
+    if scope is None:
+        return
+    for name, node in timeline["nodes"].items():
+        scope.stages[f"agent:{name}"] = node["finish"] - node["start"]
+
+
+def write_report(trace_path, report_path: Path = None) -> Path:
+    report = instrumentation.build_report(trace_path)
+    report_path = report_path or Path(trace_path).with_suffix(".report.json")
+    write_json(report_path, report)
+    print("Run report:")
+    for line in instrumentation.format_report(report):
+        print(line)
+    print(f"- Report: {report_path}")
+    return report_path
 
-    kyb_status = merged.get("kyb_status", "UNKNOWN")
-    compliance_status = (
-        merged.get("compliance_summary", {}).get("status")
-        if isinstance(merged.get("compliance_summary"), dict)
-        else "UNKNOWN"
-    )
-    credit_decision = merged.get("credit_decision", "UNKNOWN")
-    cross_sell = merged.get("cross_sell_opportunities") or []
+
+def main():
+    ensure_worktrees()
+    instrumentation.reset_trace()
+
+    store = dossier_store.FileStore(DOSSIER_PATH)
+    timeline = {}
+    with instrumentation.agent("autopilot") as scope:
+        # Optimistic: agents run without holding the dossier, and the run is
+        # repeated on the new version if someone else committed meanwhile.
+        for attempt in range(1, SAVE_ATTEMPTS + 1):
+            with instrumentation.stage("load_dossier"):
+                base_dossier, version = store.load()
+                checkpoint = read_state(DEFAULT_PATHS["checkpoint_path"])
+            if ORCHESTRATOR == "async":
+                merged = asyncio.run(run_pipeline_async(base_dossier, timeline=timeline))
+            else:
+                merged = run_pipeline(base_dossier, timeline=timeline)
+            try:
+                with instrumentation.stage("write_dossier"):
+                    store.save(merged, expected_version=version)
+                break
+            except dossier_store.VersionConflict:
+                # An incremental sentinel run has already moved its checkpoint
+                # past the lines whose signals went into the discarded dossier;
+                # rewind it so the rerun reads them again.
+                restore_state(DEFAULT_PATHS["checkpoint_path"], checkpoint)
+                if attempt == SAVE_ATTEMPTS:
+                    raise
+                print("Dossier changed during the run; rerunning on the new version.")
+        record_timeline(scope, timeline)
+        with instrumentation.stage("copy_artifacts"):
+            copy_artifacts()
+
+    status = dossier_status(merged)
 
     print("Final dossier status:")
-    print(f"- KYB status: {kyb_status}")
-    print(f"- Compliance status: {compliance_status}")
-    print(f"- Credit decision: {credit_decision}")
-    print(f"- Cross-sell opportunities: {len(cross_sell)}")
+    print(f"- KYB status: {status['kyb_status']}")
+    print(f"- Compliance status: {status['compliance_status']}")
+    print(f"- Credit decision: {status['credit_decision']}")
+    print(f"- Cross-sell opportunities: {status['cross_sell']}")
+    if CACHE_ENABLED:
+        print(f"- Agent cache: {CACHE_STATS['hits']} hits, {CACHE_STATS['misses']} misses")
+    if PATCH_STATS["written_bytes"]:
+        print(f"- Dossier I/O: {format_patch_stats(PATCH_STATS)}")
+    print("Schedule:")
+    for name, node in timeline["nodes"].items():
+        after = f" (after {', '.join(node['after'])})" if node["after"] else ""
+        status = f" [{node['status']}]" if node.get("status", "ok") != "ok" else ""
+        print(f"- {name}: {node['start']:.3f}s -> {node['finish']:.3f}s{after}{status}")
+    print(
+        f"- Critical path: {' -> '.join(timeline['critical_path'])} "
+        f"{timeline['critical_path_seconds']:.3f}s of {timeline['wall_seconds']:.3f}s wall"
+    )
     print("Artifacts:")
     print(f"- Credit Memo: {WORKTREES['risk'] / 'Credit_Memo.md'}")
     print(f"- Sales Brief: {WORKTREES['sales'] / 'Sales_Brief.md'}")
+    if instrumentation.ENABLED:
+        write_report(instrumentation.TRACE_PATH)
 
 
 if __name__ == "__main__":
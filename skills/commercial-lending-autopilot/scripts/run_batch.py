@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import os
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from run_autopilot import (
+    AGENTS,
+    CACHE_ENABLED,
+    CACHE_STATS,
+    DEFAULT_PATHS,
+    EXECUTION_MODE,
+    PATCH_STATS,
+    ROOT,
+    SHORT_CIRCUIT,
+    client_paths,
+    dossier_status,
+    dossier_store,
+    format_patch_stats,
+    instrumentation,
+    load_agent,
+    load_json,
+    record_timeline,
+    run_pipeline,
+    run_pipeline_async,
+    write_report,
+)
+
+CLIENTS_DIR = ROOT / "docs" / "clients"
+OUTPUT_DIR = ROOT / "batch_output"
+CLIENT_FILES = ("articles_inc.txt", "financials.txt", "bank_statement.txt")
+
+
+def find_clients(clients_dir: Path):
+    clients = []
+    skipped = []
+    for path in sorted(clients_dir.iterdir()):
+        if not path.is_dir():
+            continue
+        if all((path / name).exists() for name in CLIENT_FILES):
+            clients.append(path)
+        else:
+            skipped.append(path)
+    return clients, skipped
+
+
+def client_input(client_dir: Path, output_dir: Path) -> dict:
+    # A client folder may seed its own dossier; otherwise start empty.
+    # Incremental sentinel runs continue from the previous output, since
+    # its transaction checkpoint lives next to that dossier.
+    previous = output_dir / "company_dossier.json"
+    if os.environ.get("SENTINEL_INCREMENTAL") == "1" and previous.exists():
+        return load_json(previous)
+    return load_json(client_dir / "company_dossier.json")
+
+
+def save_client(client: str, output_dir: Path, merged: dict, sqlite_path: str = None):
+    with instrumentation.stage("write_dossier"):
+        dossier_store.FileStore(output_dir / "company_dossier.json").save(merged)
+    if sqlite_path:
+        with instrumentation.stage("write_sqlite"):
+            dossier_store.SQLiteStore(Path(sqlite_path)).save(client, merged)
+
+
+def agent_outcomes(timeline: dict) -> dict:
+    return {
+        name: {"seconds": node["finish"] - node["start"], "status": node.get("status", "ok")}
+        for name, node in timeline["nodes"].items()
+    }
+
+
+def run_client(
+    client_dir: str,
+    output_root: str,
+    sanctions_path: str,
+    mode: str,
+    sqlite_path: str = None,
+    progress=None,
+) -> dict:
+    started = time.perf_counter()
+    client_dir = Path(client_dir)
+    output_dir = Path(output_root) / client_dir.name
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    result = {"client": client_dir.name, "output_dir": str(output_dir), "error": None}
+    # Workers are separate processes, so report this client's share of the counters.
+    cache_before = dict(CACHE_STATS)
+    patch_before = dict(PATCH_STATS)
+    try:
+        base_dossier = client_input(client_dir, output_dir)
+        paths = client_paths(client_dir, output_dir, Path(sanctions_path))
+        timeline = {}
+        with instrumentation.agent("autopilot") as scope:
+            merged = run_pipeline(base_dossier, paths, mode, timeline=timeline, progress=progress)
+            record_timeline(scope, timeline)
+            save_client(client_dir.name, output_dir, merged, sqlite_path)
+        result.update(dossier_status(merged))
+        result["agents"] = agent_outcomes(timeline)
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["cache"] = {key: CACHE_STATS[key] - cache_before[key] for key in CACHE_STATS}
+    result["patch"] = {key: PATCH_STATS[key] - patch_before[key] for key in PATCH_STATS}
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+async def run_client_async(
+    client_dir: str,
+    output_root: str,
+    sanctions_path: str,
+    mode: str,
+    limiter: asyncio.Semaphore,
+    sqlite_path: str = None,
+    short_circuit: bool = SHORT_CIRCUIT,
+) -> dict:
+    started = time.perf_counter()
+    client_dir = Path(client_dir)
+    output_dir = Path(output_root) / client_dir.name
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    result = {"client": client_dir.name, "output_dir": str(output_dir), "error": None}
+    try:
+        base_dossier = client_input(client_dir, output_dir)
+        paths = client_paths(client_dir, output_dir, Path(sanctions_path))
+        timeline = {}
+        with instrumentation.agent("autopilot") as scope:
+            merged = await run_pipeline_async(
+                base_dossier, paths, mode, timeline=timeline, limiter=limiter, short_circuit=short_circuit,
+            )
+            record_timeline(scope, timeline)
+            # fsync would otherwise stall every other client on the loop.
+            await asyncio.to_thread(save_client, client_dir.name, output_dir, merged, sqlite_path)
+        result.update(dossier_status(merged))
+        result["agents"] = agent_outcomes(timeline)
+        result["halted"] = timeline["halted"]
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+async def run_clients_async(clients, output_root: str, sanctions_path: str, mode: str, concurrency: int,
+                            sqlite_path: str = None, short_circuit: bool = SHORT_CIRCUIT) -> list:
+    # One bound on agents in flight, shared by every client's pipeline.
+    limiter = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(
+        run_client_async(str(path), output_root, sanctions_path, mode, limiter, sqlite_path, short_circuit)
+        for path in clients
+    ))
+
+
+def cpu_seconds() -> float:
+    # This process plus every reaped child: pool workers and agent subprocesses.
+    total = 0.0
+    for who in (resource.RUSAGE_SELF, resource.RUSAGE_CHILDREN):
+        usage = resource.getrusage(who)
+        total += usage.ru_utime + usage.ru_stime
+    return total
+
+
+def print_latency(results):
+    clients = instrumentation.tail_latency(result["seconds"] for result in results)
+    if not clients:
+        return
+    print("Latency: " + "  ".join(f"{key} {value:.3f}s" for key, value in clients.items()))
+    outcomes = [result.get("agents", {}) for result in results]
+    unfinished = {}
+    for name in AGENTS:
+        runs = [agents[name] for agents in outcomes if name in agents]
+        latency = instrumentation.tail_latency(run["seconds"] for run in runs if run["status"] == "ok")
+        if latency:
+            print(f"- {name}: " + "  ".join(f"{key} {value:.3f}s" for key, value in latency.items()))
+        for run in runs:
+            if run["status"] != "ok":
+                unfinished[run["status"]] = unfinished.get(run["status"], 0) + 1
+    if unfinished:
+        print("Agents not completed: " + ", ".join(f"{count} {status}" for status, count in unfinished.items()))
+
+
+def print_summary(results, elapsed: float, cache: dict = None, patch: dict = None):
+    """Per-client table and totals; ``cache``/``patch`` override the per-client sums."""
+    header = ("client", "kyb", "compliance", "decision", "cross_sell", "seconds")
+    rows = []
+    for result in results:
+        if result["error"]:
+            rows.append((result["client"], "ERROR", "-", "-", "-", f"{result['seconds']:.3f}"))
+            continue
+        rows.append((
+            result["client"],
+            result["kyb_status"],
+            result["compliance_status"],
+            result["credit_decision"],
+            str(result["cross_sell"]),
+            f"{result['seconds']:.3f}",
+        ))
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    print("  ".join(value.ljust(widths[i]) for i, value in enumerate(header)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        print("  ".join(value.ljust(widths[i]) for i, value in enumerate(row)))
+
+    for result in results:
+        if result["error"]:
+            print(f"{result['client']} failed: {result['error']}")
+
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+    print(f"Clients: {len(results)}  Wall time: {elapsed:.3f}s  Throughput: {throughput:.2f} clients/s")
+    print_latency(results)
+    blocked = [result for result in results if result.get("halted")]
+    if blocked:
+        stopped = sum(len(result["halted"]) for result in blocked)
+        print(f"Short circuit: {len(blocked)} of {len(results)} clients blocked by compliance, {stopped} agent runs stopped")
+    cache = cache or {key: sum(result["cache"][key] for result in results) for key in CACHE_STATS}
+    patch = patch or {key: sum(result["patch"][key] for result in results) for key in PATCH_STATS}
+    if CACHE_ENABLED:
+        print(f"Agent cache: {cache['hits']} hits, {cache['misses']} misses")
+    if patch["written_bytes"]:
+        print(f"Dossier I/O: {format_patch_stats(patch)}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the lending autopilot over a directory of client folders.")
+    parser.add_argument("clients_dir", nargs="?", type=Path, default=CLIENTS_DIR)
+    parser.add_argument("--output-dir", type=Path, default=OUTPUT_DIR)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes, or with --async the agents running at once")
+    parser.add_argument("--sanctions", type=Path, default=DEFAULT_PATHS["sanctions_path"])
+    parser.add_argument("--mode", choices=("inprocess", "subprocess"), default=EXECUTION_MODE)
+    parser.add_argument("--sqlite", type=Path, help="also upsert every client's dossier into this SQLite store")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="run every client in one event loop with per-agent deadlines and cancellation")
+    parser.add_argument("--short-circuit", action="store_true", default=SHORT_CIRCUIT,
+                        help="stop underwriting and sales for clients compliance blocks (implies --async)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    clients, skipped = find_clients(args.clients_dir)
+    for path in skipped:
+        print(f"skipping {path.name}: expected {', '.join(CLIENT_FILES)}")
+
+    instrumentation.reset_trace()
+    started = time.perf_counter()
+    cpu_started = cpu_seconds()
+    # Compile the sanctions index once up front; workers then hit the warm cache.
+    load_agent("compliance").load_sanctions_index(args.sanctions)
+    sqlite_path = str(args.sqlite) if args.sqlite else None
+    totals = {}
+    if args.use_async or args.short_circuit:
+        # Clients share this process, so the counters are only meaningful in total.
+        results = asyncio.run(run_clients_async(
+            clients, str(args.output_dir), str(args.sanctions), args.mode, max(1, args.workers), sqlite_path,
+            args.short_circuit,
+        ))
+        totals = {"cache": dict(CACHE_STATS), "patch": dict(PATCH_STATS)}
+    else:
+        with ProcessPoolExecutor(max_workers=max(1, args.workers)) as executor:
+            futures = [
+                executor.submit(
+                    run_client, str(path), str(args.output_dir), str(args.sanctions), args.mode, sqlite_path,
+                )
+                for path in clients
+            ]
+            results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    print_summary(results, elapsed, **totals)
+    print(f"CPU time: {cpu_seconds() - cpu_started:.3f}s")
+    if instrumentation.ENABLED:
+        write_report(instrumentation.TRACE_PATH)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "skills" / "commercial-lending-autopilot" / "scripts"))
+import autopilot_worker  # noqa: E402
+
+CLIENT = ROOT / "docs" / "clients" / "fx-only"
+
+
+def make_worker() -> autopilot_worker.Worker:
+    return autopilot_worker.Worker(1, 1, autopilot_worker.DEFAULT_PATHS["sanctions_path"])
+
+
+def test_unwritable_output_dir_is_refused_before_queueing(tmp_path):
+    worker = make_worker()
+    blocker = tmp_path / "file"
+    blocker.write_text("", encoding="utf-8")
+    events = []
+    assert worker.submit({"client_dir": str(CLIENT), "output_dir": str(blocker / "out")}, events.append) is None
+    assert [event["event"] for event in events] == ["error"]
+    assert worker.stats()["jobs"]["queued"] == 0
+
+
+def test_crashed_job_still_reports_done(tmp_path, monkeypatch):
+    def crash(*args, **kwargs):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(autopilot_worker, "run_client", crash)
+    worker = make_worker()
+    events = []
+    future = worker.submit({"client_dir": str(CLIENT), "output_dir": str(tmp_path)}, events.append)
+    future.result(timeout=10)
+    assert events[-1]["event"] == "done"
+    assert events[-1]["error"] == "RuntimeError: boom"
+    jobs = worker.stats()["jobs"]
+    assert (jobs["failed"], jobs["done"], jobs["running"]) == (1, 0, 0)
+    worker.executor.shutdown()
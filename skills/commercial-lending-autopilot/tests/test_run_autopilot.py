@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "skills" / "commercial-lending-autopilot" / "scripts"))
+sys.path.insert(0, str(ROOT / "skills" / "credit-underwriter" / "scripts"))
+import run_autopilot  # noqa: E402
+import underwrite  # noqa: E402
+
+CLIENT = ROOT / "docs" / "clients" / "greenline-logistics"
+
+
+def seeded(amount: int) -> dict:
+    return {
+        "entity_name": "Greenline Logistics",
+        "industry": "Logistics",
+        "financials": {"proposed_loan_amount": amount, "dscr": 0.1, "by_period": {}},
+    }
+
+
+def run(tmp_path: Path, dossier: dict, mode: str) -> dict:
+    output_dir = tmp_path / "out"
+    output_dir.mkdir(exist_ok=True)
+    paths = run_autopilot.client_paths(CLIENT, output_dir)
+    return run_autopilot.run_pipeline(dossier, paths, mode)
+
+
+def test_derived_financials_match_underwriter():
+    assert run_autopilot.AGENTS["risk"]["derived"]["financials"] == underwrite.DERIVED_FIELDS
+
+
+@pytest.mark.parametrize("mode", ["inprocess", "subprocess"])
+def test_underwriting_keeps_other_financials(tmp_path, monkeypatch, mode):
+    monkeypatch.setattr(run_autopilot, "CACHE_ENABLED", False)
+    merged = run(tmp_path, seeded(500_000), mode)
+    financials = merged["financials"]
+    assert financials["proposed_loan_amount"] == 500_000
+    # Figures from the seed are recomputed, not carried over.
+    assert financials["dscr"] == pytest.approx(1_780_000 / 900_000)
+    assert "by_period" not in financials
+    assert merged["credit_decision"] == "APPROVE"
+
+
+def test_cache_keys_on_other_financials(tmp_path, monkeypatch):
+    monkeypatch.setattr(run_autopilot, "CACHE_DIR", tmp_path / "cache")
+    monkeypatch.setattr(run_autopilot, "CACHE_ENABLED", True)
+    first = run(tmp_path, seeded(500_000), "inprocess")
+    # Only the recomputed figures differ, so underwriting is a hit.
+    rerun = seeded(500_000)
+    rerun["financials"].update(first["financials"])
+    hits = run_autopilot.CACHE_STATS["hits"]
+    again = run(tmp_path, rerun, "inprocess")
+    assert run_autopilot.CACHE_STATS["hits"] > hits
+    assert again["financials"] == first["financials"]
+
+    other = run(tmp_path, seeded(750_000), "inprocess")
+    assert other["financials"]["proposed_loan_amount"] == 750_000
+    assert other["financials"]["dscr"] == first["financials"]["dscr"]
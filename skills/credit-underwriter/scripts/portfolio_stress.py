@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+import argparse
+import csv
+import json
+import math
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+try:
+    import numpy as np
+except ImportError:  # grids fall back to nested lists
+    np = None
+
+from underwrite import APPROVE_DSCR, DECLINE_DSCR, ROOT, decide
+
+SCENARIOS_PATH = Path(
+    os.environ.get("STRESS_SCENARIOS_PATH", ROOT / "skills" / "credit-underwriter" / "stress_scenarios.json")
+)
+OUTPUT_PATH = Path(os.environ.get("STRESS_OUTPUT_PATH", ROOT / "portfolio_stress.csv"))
+
+LOAN_FIELDS = ["gross_revenue", "operating_expenses", "depreciation", "annual_debt_service"]
+MULTIPLIERS = ["revenue", "opex", "debt_service"]
+# Decision codes in the grid; index into DECISIONS for the label.
+DECISIONS = ["APPROVE", "REVIEW", "DECLINE", "BLOCKED"]
+APPROVE, REVIEW, DECLINE, BLOCKED = range(len(DECISIONS))
+
+
+def parse_value(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def is_blocked(flags) -> bool:
+    if isinstance(flags, str):
+        flags = [flag.strip() for flag in flags.split(";")]
+    return isinstance(flags, list) and "CRITICAL" in flags
+
+
+def load_loans_csv(path: Path):
+    with path.open(encoding="utf-8", newline="") as handle:
+        for index, row in enumerate(csv.DictReader(handle)):
+            loan = {"loan_id": row.get("loan_id") or f"{path.stem}-{index}"}
+            for field in LOAN_FIELDS:
+                loan[field] = parse_value(row.get(field))
+            loan["blocked"] = is_blocked(row.get("regulatory_flags") or "")
+            yield loan
+
+
+def load_loan_dossier(path: Path) -> dict:
+    dossier = json.loads(path.read_text(encoding="utf-8"))
+    financials = dossier.get("financials")
+    if not isinstance(financials, dict):
+        financials = {}
+    loan = {"loan_id": dossier.get("entity_name") or path.parent.name}
+    for field in LOAN_FIELDS:
+        loan[field] = parse_value(financials.get(field))
+    loan["blocked"] = is_blocked(dossier.get("regulatory_flags"))
+    return loan
+
+
+def load_loans(paths):
+    loans = []
+    for path in paths:
+        if path.suffix.lower() == ".json":
+            loans.append(load_loan_dossier(path))
+        else:
+            loans.extend(load_loans_csv(path))
+    return loans
+
+
+def load_scenarios(path: Path = SCENARIOS_PATH):
+    if not path.exists():
+        return [{"name": "base", "revenue": 1.0, "opex": 1.0, "debt_service": 1.0}]
+    config = json.loads(path.read_text(encoding="utf-8"))
+    scenarios = []
+    for scenario in config.get("scenarios") or []:
+        entry = {"name": scenario["name"]}
+        for key in MULTIPLIERS:
+            entry[key] = float(scenario.get(key, 1.0))
+        scenarios.append(entry)
+    return scenarios
+
+
+def stress_grid(loans, scenarios) -> dict:
+    """EBITDA, DSCR and decision code for every loan x scenario pair.
+
+    Uses the same formulas and thresholds as underwrite.run: missing inputs
+    or zero debt service leave DSCR undefined (NaN) and the decision at
+    REVIEW, and CRITICAL regulatory flags block the loan in every scenario.
+    """
+    if np is None:
+        return stress_grid_lists(loans, scenarios)
+
+    def column(field):
+        return np.array([loan[field] for loan in loans], dtype=float)[:, None]  # None becomes NaN
+
+    def multiplier(key):
+        return np.array([scenario[key] for scenario in scenarios], dtype=float)[None, :]
+
+    gross, opex, depreciation, debt_service = (column(field) for field in LOAN_FIELDS)
+    ebitda = (gross * multiplier("revenue") - opex * multiplier("opex")) + depreciation
+    stressed_debt = debt_service * multiplier("debt_service")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dscr = np.where(stressed_debt != 0, ebitda / stressed_debt, np.nan)
+        decision = np.where(dscr > APPROVE_DSCR, APPROVE, np.where(dscr < DECLINE_DSCR, DECLINE, REVIEW))
+    blocked = np.array([loan["blocked"] for loan in loans], dtype=bool)
+    decision[blocked, :] = BLOCKED
+    return {"ebitda": ebitda, "dscr": dscr, "decision": decision}
+
+
+def stress_grid_lists(loans, scenarios) -> dict:
+    codes = {label: code for code, label in enumerate(DECISIONS)}
+    grid = {"ebitda": [], "dscr": [], "decision": []}
+    for loan in loans:
+        gross, opex, depreciation, debt_service = (loan[field] for field in LOAN_FIELDS)
+        ebitda_row, dscr_row, decision_row = [], [], []
+        for scenario in scenarios:
+            ebitda = None
+            if gross is not None and opex is not None and depreciation is not None:
+                ebitda = (gross * scenario["revenue"] - opex * scenario["opex"]) + depreciation
+            dscr = None
+            # Guard the stressed figure, as the NumPy path does: a scenario
+            # can zero out debt service even when the loan's is non-zero.
+            stressed_debt = None if debt_service is None else debt_service * scenario["debt_service"]
+            if ebitda is not None and stressed_debt not in (None, 0):
+                dscr = ebitda / stressed_debt
+            ebitda_row.append(math.nan if ebitda is None else ebitda)
+            dscr_row.append(math.nan if dscr is None else dscr)
+            decision_row.append(BLOCKED if loan["blocked"] else codes[decide(dscr)])
+        grid["ebitda"].append(ebitda_row)
+        grid["dscr"].append(dscr_row)
+        grid["decision"].append(decision_row)
+    return grid
+
+
+def grid_lists(grid) -> dict:
+    return {key: values.tolist() if hasattr(values, "tolist") else values for key, values in grid.items()}
+
+
+def iter_rows(loans, scenarios, grid):
+    grid = grid_lists(grid)
+    for i, loan in enumerate(loans):
+        for j, scenario in enumerate(scenarios):
+            ebitda = grid["ebitda"][i][j]
+            dscr = grid["dscr"][i][j]
+            yield {
+                "loan_id": loan["loan_id"],
+                "scenario": scenario["name"],
+                "ebitda": None if math.isnan(ebitda) else round(ebitda, 2),
+                "dscr": None if math.isnan(dscr) else round(dscr, 4),
+                "decision": DECISIONS[grid["decision"][i][j]],
+            }
+
+
+def write_table(rows, path: Path) -> Path:
+    columns = ["loan_id", "scenario", "ebitda", "dscr", "decision"]
+    if path.suffix.lower() == ".parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            path = path.with_suffix(".csv")
+            print(f"pyarrow not installed; writing {path.name} instead")
+        else:
+            rows = list(rows)
+            table = pa.table({column: [row[column] for row in rows] for column in columns})
+            pq.write_table(table, path)
+            return path
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def print_summary(loans, scenarios, grid):
+    grid = grid_lists(grid)
+    print(f"{'scenario':34} " + " ".join(f"{label:>8}" for label in DECISIONS) + f" {'worse':>8}")
+    for j, scenario in enumerate(scenarios):
+        codes = [row[j] for row in grid["decision"]]
+        counts = Counter(codes)
+        # Loans whose decision degrades against the first (base) scenario.
+        worse = sum(1 for row in grid["decision"] if row[j] != BLOCKED and row[j] > row[0])
+        print(
+            f"{scenario['name']:34} "
+            + " ".join(f"{counts.get(code, 0):>8}" for code in range(len(DECISIONS)))
+            + f" {worse:>8}"
+        )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run DSCR stress scenarios across a loan portfolio.")
+    parser.add_argument("sources", nargs="+", type=Path, help="Loan tape CSV files and/or dossier JSON files.")
+    parser.add_argument("--scenarios", type=Path, default=SCENARIOS_PATH)
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="CSV, or .parquet when pyarrow is installed.")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    loans = load_loans(args.sources)
+    scenarios = load_scenarios(args.scenarios)
+
+    started = time.perf_counter()
+    grid = stress_grid(loans, scenarios)
+    elapsed = time.perf_counter() - started
+
+    output = write_table(iter_rows(loans, scenarios, grid), args.output)
+    print_summary(loans, scenarios, grid)
+    print(
+        f"{len(loans)} loans x {len(scenarios)} scenarios in {elapsed * 1000:.1f} ms "
+        f"({'numpy' if np is not None else 'lists'}) -> {output}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,36 @@
 #!/usr/bin/env python3
+import csv
+import hashlib
 import json
+import math
 import os
 import re
+import sys
+import tempfile
+import zipfile
+from array import array
+from functools import lru_cache
 from pathlib import Path
+from xml.etree import ElementTree
 
 ROOT = Path(__file__).resolve().parents[3]
-FINANCIALS_PATH = ROOT / "docs" / "financials.txt"
+SHARED_DIR = ROOT / "skills" / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+import instrumentation  # noqa: E402
+import dossier_patch  # noqa: E402
+import dossier_store  # noqa: E402
+import cancellation  # noqa: E402
+FINANCIALS_PATH = Path(os.environ.get("FINANCIALS_PATH", ROOT / "docs" / "financials.txt"))
 DOSSIER_PATH = Path(os.environ.get("DOSSIER_PATH", ROOT / "company_dossier.json"))
-MEMO_PATH = ROOT / "Credit_Memo.md"
+MEMO_PATH = Path(os.environ.get("CREDIT_MEMO_PATH", ROOT / "Credit_Memo.md"))
+# Spreadsheet financials are parsed once per file content and cached here.
+TABLE_CACHE_DIR = Path(os.environ.get("FINANCIALS_CACHE_DIR", ROOT / ".cache" / "financials"))
+TABLE_CACHE_VERSION = 2
+TABLE_SUFFIXES = {".csv", ".xlsx"}
+# Text statements are read in runs of whole lines of about this many
+# characters, so a long package is never held in memory at once.
+STREAM_BLOCK_CHARS = int(os.environ.get("FINANCIALS_BLOCK_CHARS", 1 << 20))
 
 FIELDS = {
     "gross_revenue": ["gross revenue", "revenue", "total revenue"],
@@ -17,11 +40,54 @@ FIELDS = {
     "proposed_loan_amount": ["proposed loan amount", "loan amount"],
 }
 
-
-def load_text(path: Path) -> str:
+# DSCR policy thresholds shared with the portfolio stress engine.
+APPROVE_DSCR = 1.25
+DECLINE_DSCR = 1.0
+
+# Everything str.splitlines() treats as a line boundary.
+LINE_BREAK_RE = re.compile("[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]")
+VALUE_SPLIT_RE = re.compile(r"[:\-]")
+NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+# Fiscal period markers: "FY2024", "FY 2024", "Fiscal Year 2024", "2024A", "2025E".
+PERIOD_RE = re.compile(r"\b(?:fy\s*(\d{4})|fiscal\s+year\s+(\d{4})|((?:19|20)\d{2})[ae])\b", re.IGNORECASE)
+# Text PERIOD_RE can match contains "fy", "fiscal" or one of these; checking
+# for them first is several times cheaper on a long block with no periods.
+YEAR_RE = re.compile(r"(?:19|20)\d\d")
+PERIOD_TOKEN = r"(?:fy\s*\d{4}|fiscal\s+year\s+\d{4}|(?:19|20)\d{2}[ae])"
+# A heading whose only values are periods: "Financial Summary (FY2024)",
+# "Line Item: FY2022 | FY2023 | FY2024". Periods inside a sentence
+# ("Coverage: Historical 2023A-2025A and YTD 2026") do not qualify.
+PERIOD_HEADER_RE = re.compile(
+    rf"^[^\d:]*?[:(]?\s*({PERIOD_TOKEN}(?:\s*[|,]?\s*{PERIOD_TOKEN})*)\s*\)?\s*$", re.IGNORECASE
+)
+# Ratios and percentages share labels with amounts ("OpEx Ratio", "Linehaul GM %").
+RATIO_RE = re.compile(r"\bratio\b|%|\(x\)", re.IGNORECASE)
+AMOUNT_TOKEN_RE = re.compile(r"-?\$?\d[\d,]*(?:\.\d+)?")
+AMOUNT_CELL_RE = re.compile(r"\(?-?\$?\s?\d[\d,]*(?:\.\d+)?\)?")
+THOUSANDS_RE = re.compile(r"\$\s?000|in thousands", re.IGNORECASE)
+XLSX_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+XLSX_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+SPREAD_FIELDS = ["gross_revenue", "operating_expenses", "depreciation", "annual_debt_service"]
+# The financials keys every run recomputes; any other key is left as found.
+DERIVED_FIELDS = SPREAD_FIELDS + [
+    "ebitda", "dscr", "period", "periods", "by_period", "trailing_dscr",
+    "average_dscr", "revenue_growth", "ebitda_growth", "revenue_cagr",
+]
+
+# Dossier keys this agent writes and how the autopilot merges them.
+PATCH_OPS = {"financials": "set", "credit_decision": "set"}
+
+
+def iter_blocks(path: Path, size: int = STREAM_BLOCK_CHARS):
+    """Yield a statement as consecutive runs of whole lines."""
     if not path.exists():
-        return ""
-    return path.read_text(encoding="utf-8", errors="replace")
+        return
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        while True:
+            lines = handle.readlines(size)
+            if not lines:
+                return
+            yield "".join(lines)
 
 
 def load_json(path: Path) -> dict:
@@ -36,7 +102,7 @@ def parse_number(value: str):
     cleaned = value.replace(",", "")
     cleaned = cleaned.replace("$", "")
     cleaned = cleaned.replace(" ", "")
-    match = re.search(r"-?\d+(?:\.\d+)?", cleaned)
+    match = NUMBER_RE.search(cleaned)
     if not match:
         return None
     try:
@@ -57,6 +123,406 @@ def extract_field(text: str, labels):
     return None
 
 
+def parse_line(line: str):
+    parts = VALUE_SPLIT_RE.split(line, maxsplit=1)
+    if len(parts) > 1:
+        return parse_number(parts[1])
+    return parse_number(line)
+
+
+@lru_cache(maxsize=None)
+def label_matcher(labels: tuple):
+    return re.compile("|".join(re.escape(label) for label in labels))
+
+
+def line_bounds(text: str, position: int):
+    start = text.rfind("\n", 0, position) + 1
+    for match in LINE_BREAK_RE.finditer(text, start, position):
+        start = match.end()
+    match = LINE_BREAK_RE.search(text, position)
+    return start, match.start() if match else len(text)
+
+
+def extract_fields(text: str, fields=FIELDS) -> dict:
+    """Extract every field in one pass; same results as extract_field per key.
+
+    The text is lower-cased once and searched with a single alternation over
+    the labels of the fields still pending. Each hit resolves every pending
+    field with a label on that line (the first such line wins, as before),
+    and the scan resumes on the next line with a narrower matcher, so it
+    stops as soon as all fields are found.
+    """
+    return dict(dict.fromkeys(fields), **find_fields(text, fields))
+
+
+def find_fields(text: str, fields=FIELDS) -> dict:
+    """The fields ``extract_fields`` resolves in ``text``, and only those."""
+    lowered = text.lower()
+    # Case mapping almost never changes length; when it does, parse the
+    # lowered line, which yields the same digits and separators.
+    source = text if len(lowered) == len(text) else lowered
+    parsed = {}
+    pending = list(fields)
+    position = 0
+    while pending:
+        labels = tuple(sorted({label for key in pending for label in fields[key]}))
+        match = label_matcher(labels).search(lowered, position)
+        if match is None:
+            break
+        start, end = line_bounds(lowered, match.start())
+        line = lowered[start:end]
+        value = parse_line(source[start:end])
+        for key in [key for key in pending if any(label in line for label in fields[key])]:
+            parsed[key] = value
+            pending.remove(key)
+        position = end
+    return parsed
+
+
+@lru_cache(maxsize=None)
+def label_prefix(label: str):
+    return re.compile(re.escape(label) + r"(?![a-z0-9])")
+
+
+def label_ranks(label: str, fields=FIELDS) -> dict:
+    """Fields a lower-cased row label names, with how closely.
+
+    0 for a label equal to a field label ("total revenue"), 1 for one that
+    starts with it ("depreciation & amortization"). A component line that
+    merely contains a label ("linehaul revenue") and ratio or percentage
+    rows name no field.
+    """
+    if not label or RATIO_RE.search(label):
+        return {}
+    ranks = {}
+    for key, labels in fields.items():
+        if label in labels:
+            ranks[key] = 0
+        elif any(label_prefix(text).match(label) for text in labels):
+            ranks[key] = 1
+    return ranks
+
+
+class PeriodSpread:
+    """Collect field values for every fiscal period in a statement.
+
+    A heading naming one period ("Financial Summary (FY2024)") starts a
+    section for it; one naming several ("Line Item: FY2022 FY2023 FY2024")
+    switches to columns, where each field line carries one amount per period
+    in header order. Field lines are matched on their label as in
+    ``label_ranks``; within a period an exact label beats a prefixed one and
+    the first line with an amount wins. Lines are fed in order, in as many
+    calls as the statement is read in; ``columns`` is empty until a heading
+    is seen, so until then only lines naming a period matter.
+    """
+
+    def __init__(self, fields=FIELDS):
+        self.fields = fields
+        self.columns = []
+        self.values = {}
+        self.any_label = label_matcher(tuple(label for labels in fields.values() for label in labels))
+
+    def feed(self, lines):
+        for line in lines:
+            header = PERIOD_HEADER_RE.match(line.strip())
+            if header:
+                self.columns = list(
+                    dict.fromkeys("FY" + "".join(groups) for groups in PERIOD_RE.findall(header.group(1)))
+                )
+                continue
+            if not self.columns or not self.any_label.search(line.lower()):
+                continue
+            label, _, value_text = line.partition(":")
+            ranks = label_ranks(label.strip().lstrip("-*• ").lower(), self.fields)
+            if not ranks or "%" in value_text:
+                continue
+            if len(self.columns) == 1:
+                amounts = [parse_line(line.rstrip("\r\n"))]
+            else:
+                value_text = PERIOD_RE.sub(" ", VALUE_SPLIT_RE.split(line, maxsplit=1)[-1])
+                amounts = [parse_number(token) for token in AMOUNT_TOKEN_RE.findall(value_text)]
+            for period, amount in zip(self.columns, amounts):
+                if amount is None:
+                    continue
+                found = self.values.setdefault(period, {})
+                for key, rank in ranks.items():
+                    if key not in found or rank < found[key][0]:
+                        found[key] = (rank, amount)
+
+    def result(self) -> dict:
+        """Amounts per period; periods left without any amount are dropped."""
+        return {
+            period: {key: amount for key, (_, amount) in found.items()}
+            for period, found in self.values.items()
+        }
+
+
+def spread_periods(lines, fields=FIELDS) -> dict:
+    spread = PeriodSpread(fields)
+    spread.feed(lines)
+    return spread.result()
+
+
+def may_name_period(block: str) -> bool:
+    lowered = block.lower()
+    if "fy" not in lowered and "fiscal" not in lowered and not YEAR_RE.search(block):
+        return False
+    return PERIOD_RE.search(block) is not None
+
+
+def scan_statement(blocks, fields=FIELDS):
+    """Extract fields and spread periods in one pass over a text statement.
+
+    ``blocks`` are runs of whole lines (see ``iter_blocks``). Fields resolve
+    as in ``extract_fields``, the first block naming one winning. A block
+    with no period token is skipped by the spread unless a heading has
+    already opened a period.
+    """
+    parsed = dict.fromkeys(fields)
+    pending = dict(fields)
+    spread = PeriodSpread(fields)
+    for block in blocks:
+        cancellation.check()
+        if pending:
+            found = find_fields(block, pending)
+            parsed.update(found)
+            for key in found:
+                del pending[key]
+        if spread.columns or may_name_period(block):
+            spread.feed(block.splitlines())
+    return parsed, spread.result()
+
+
+def growth(series) -> array:
+    rates = array("d", [math.nan])
+    for previous, current in zip(series, series[1:]):
+        rates.append(current / previous - 1 if previous else math.nan)
+    return rates
+
+
+def as_list(series) -> list:
+    return [None if math.isnan(value) else value for value in series]
+
+
+def spread_financials(values: dict) -> dict:
+    """Time series per metric over the periods found by spread_periods.
+
+    Metrics use the same EBITDA and DSCR formulas as the single-period path;
+    a missing input leaves that period's derived values empty.
+    """
+    periods = sorted(values)
+    series = {
+        key: array("d", [values[period].get(key, math.nan) for period in periods])
+        for key in SPREAD_FIELDS
+    }
+    gross, opex, depreciation, debt_service = (series[key] for key in SPREAD_FIELDS)
+    ebitda = array("d", [(g - o) + d for g, o, d in zip(gross, opex, depreciation)])
+    dscr = array("d", [e / ds if ds else math.nan for e, ds in zip(ebitda, debt_service)])
+    series["ebitda"] = ebitda
+    series["dscr"] = dscr
+
+    valid_dscr = [value for value in dscr if not math.isnan(value)]
+    revenue = [(int(period[2:]), value) for period, value in zip(periods, gross) if not math.isnan(value)]
+    revenue_cagr = None
+    if len(revenue) > 1 and revenue[0][1] > 0 and revenue[-1][0] > revenue[0][0]:
+        (first_year, first), (last_year, last) = revenue[0], revenue[-1]
+        revenue_cagr = (last / first) ** (1 / (last_year - first_year)) - 1
+
+    return {
+        "periods": periods,
+        "by_period": {key: as_list(values) for key, values in series.items()},
+        "trailing_dscr": None if math.isnan(dscr[-1]) else dscr[-1],
+        "average_dscr": sum(valid_dscr) / len(valid_dscr) if valid_dscr else None,
+        "revenue_growth": as_list(growth(gross)),
+        "ebitda_growth": as_list(growth(ebitda)),
+        "revenue_cagr": revenue_cagr,
+    }
+
+
+def column_index(reference: str) -> int:
+    index = 0
+    for char in reference:
+        if not char.isalpha():
+            break
+        index = index * 26 + ord(char.upper()) - 64
+    return index - 1
+
+
+def xlsx_cell(cell, shared_strings):
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(node.text or "" for node in cell.iter(f"{XLSX_NS}t"))
+    value = cell.findtext(f"{XLSX_NS}v")
+    if not value:
+        # A numeric formula the workbook was saved without evaluating: the
+        # cell has a figure, just not one we can read.
+        if kind in (None, "n") and cell.find(f"{XLSX_NS}f") is not None:
+            return math.nan
+        return None
+    if kind == "s":
+        return shared_strings[int(value)]
+    if kind in ("str", "e"):
+        return value
+    if kind == "b":
+        return value == "1"
+    return float(value)
+
+
+def xlsx_sheet_names(archive: zipfile.ZipFile):
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    rels = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels}
+    for sheet in workbook.iter(f"{XLSX_NS}sheet"):
+        target = targets.get(sheet.get(f"{XLSX_REL_NS}id"), "")
+        yield sheet.get("name"), target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+
+
+def iter_xlsx_rows(path: Path):
+    # Reads the workbook read-only, streaming each sheet row by row as
+    # (sheet, cells); formulas contribute their cached values only, and NaN
+    # when there is none.
+    with zipfile.ZipFile(path) as archive:
+        shared_strings = []
+        if "xl/sharedStrings.xml" in archive.namelist():
+            strings = ElementTree.fromstring(archive.read("xl/sharedStrings.xml"))
+            shared_strings = [
+                "".join(node.text or "" for node in item.iter(f"{XLSX_NS}t"))
+                for item in strings.iter(f"{XLSX_NS}si")
+            ]
+        for sheet, name in xlsx_sheet_names(archive):
+            with archive.open(name) as handle:
+                for _, element in ElementTree.iterparse(handle):
+                    if element.tag != f"{XLSX_NS}row":
+                        continue
+                    row = []
+                    for cell in element.iter(f"{XLSX_NS}c"):
+                        index = column_index(cell.get("r", "")) if cell.get("r") else len(row)
+                        row.extend([None] * (index + 1 - len(row)))
+                        row[index] = xlsx_cell(cell, shared_strings)
+                    element.clear()
+                    yield sheet, row
+
+
+def iter_csv_rows(path: Path):
+    with path.open(encoding="utf-8", errors="replace", newline="") as handle:
+        for row in csv.reader(handle):
+            yield path.name, [parse_number(cell) if AMOUNT_CELL_RE.fullmatch(cell.strip()) else cell for cell in row]
+
+
+def iter_table_rows(path: Path):
+    if path.suffix.lower() == ".xlsx":
+        return iter_xlsx_rows(path)
+    return iter_csv_rows(path)
+
+
+def extract_table(rows, fields=FIELDS):
+    """Match spreadsheet rows to fields by their label cell in one pass.
+
+    ``rows`` are (sheet, cells) pairs. The first text cell of a row is its
+    label and is matched with ``label_ranks``, so component lines never
+    stand in for a total; ratio rows and rows whose unit cell is ``%`` are
+    skipped. An exact label beats a prefixed one, and among equals the
+    first row with an amount wins, even when that amount is a formula with
+    no cached value: the field is then left empty. Amounts under period
+    columns also feed the per-period spread, and a sheet that reports in
+    thousands has its own amounts scaled.
+    """
+    best = {}
+    periods = {}
+    columns = {}
+    current = None
+    thousands = set()
+    for sheet, row in rows:
+        if sheet != current:
+            current, columns = sheet, {}
+        texts = [(index, cell.strip()) for index, cell in enumerate(row) if isinstance(cell, str) and cell.strip()]
+        if any(THOUSANDS_RE.search(text) for _, text in texts):
+            thousands.add(sheet)
+        label = texts[0][1].lower() if texts else ""
+        if RATIO_RE.search(label) or any(text == "%" for _, text in texts):
+            continue
+        ranks = label_ranks(label, fields)
+        if not ranks:
+            header = {}
+            for index, cell in enumerate(row):
+                match = PERIOD_RE.fullmatch(cell.strip()) if isinstance(cell, str) else None
+                if match:
+                    header[index] = "FY" + "".join(match.groups(""))
+            if header or len(texts) > 1:
+                columns = header
+            continue
+        amounts = [(index, cell) for index, cell in enumerate(row) if isinstance(cell, float) and index > texts[0][0]]
+        if not amounts:
+            continue
+        for key, rank in ranks.items():
+            if key not in best or rank < best[key][0]:
+                best[key] = (rank, sheet, amounts[0][1])
+            for index, amount in amounts:
+                if index in columns:
+                    period_best = periods.setdefault(columns[index], {})
+                    if key not in period_best or rank < period_best[key][0]:
+                        period_best[key] = (rank, sheet, amount)
+
+    def dollars(sheet, value):
+        if math.isnan(value):
+            return None
+        return value * 1000 if sheet in thousands else value
+
+    parsed = {key: dollars(*best[key][1:]) if key in best else None for key in fields}
+    spread = {}
+    for period, values in periods.items():
+        found = {key: dollars(sheet, value) for key, (_, sheet, value) in values.items()}
+        found = {key: value for key, value in found.items() if value is not None}
+        if found:
+            spread[period] = found
+    return parsed, spread
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_financials_table(path: Path, cache_dir: Path = TABLE_CACHE_DIR):
+    """Parsed fields and periods for a CSV/XLSX package, cached by content hash."""
+    cache_path = cache_dir / f"{file_digest(path)}.v{TABLE_CACHE_VERSION}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+        return cached["parsed"], cached["periods"]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    parsed, periods = extract_table(iter_table_rows(path))
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=cache_dir, prefix=cache_path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"parsed": parsed, "periods": periods}, handle)
+        os.replace(temp_name, cache_path)
+    except OSError:
+        pass
+    return parsed, periods
+
+
+def format_percent(value):
+    if value is None:
+        return "n/a"
+    return f"{value * 100:+.1f}%"
+
+
+def decide(dscr) -> str:
+    if dscr is None:
+        return "REVIEW"
+    if dscr > APPROVE_DSCR:
+        return "APPROVE"
+    if dscr < DECLINE_DSCR:
+        return "DECLINE"
+    return "REVIEW"
+
+
 def format_money(value):
     if value is None:
         return "Not provided"
@@ -69,13 +535,62 @@ def format_ratio(value):
     return f"{value:.2f}x"
 
 
-def main():
-    financials_text = load_text(FINANCIALS_PATH)
-    dossier = load_json(DOSSIER_PATH)
+def build_blocked_memo(dossier: dict) -> str:
+    """Short memo for a deal compliance blocked before it was underwritten."""
+    business_name = dossier.get("entity_name", "Business")
+    summary = dossier.get("compliance_summary")
+    issues = summary.get("issues_found") if isinstance(summary, dict) else None
+    findings = []
+    for issue in issues or []:
+        if not isinstance(issue, dict):
+            findings.append(f"- {issue}")
+            continue
+        detail = ", ".join(match.get("ubo_name") or "?" for match in issue.get("matches") or [])
+        if issue.get("match"):
+            detail = f"{issue['match']} ({issue.get('value')})"
+        findings.append(f"- {issue.get('type', 'ISSUE')}" + (f": {detail}" if detail else ""))
+    findings = "\n".join(findings) or "- No issue details recorded."
+    flags = ", ".join(dossier.get("regulatory_flags") or []) or "None"
+    return f"""# Credit Memo
 
-    parsed = {}
-    for key, labels in FIELDS.items():
-        parsed[key] = extract_field(financials_text, labels)
+## 1) Executive Summary
+{business_name} is requesting commercial credit. Compliance screening returned a CRITICAL finding, so the request is **BLOCKED** and was not underwritten.
+
+## 2) Compliance Findings
+- Regulatory flags: {flags}
+{findings}
+
+## 3) Credit Recommendation
+**Decision:** BLOCKED
+"""
+
+
+def run(
+    dossier: dict,
+    financials_path: Path = FINANCIALS_PATH,
+    memo_path: Path = MEMO_PATH,
+    out=None,
+) -> dict:
+    if financials_path.suffix.lower() in TABLE_SUFFIXES and financials_path.exists():
+        with instrumentation.stage("extract_table"):
+            parsed, periods = load_financials_table(financials_path)
+    else:
+        # The statement is streamed, so "extract" covers reading and spreading.
+        with instrumentation.stage("extract"):
+            parsed, periods = scan_statement(iter_blocks(financials_path))
+    cancellation.check()
+    instrumentation.count("fields_found", sum(value is not None for value in parsed.values()))
+    instrumentation.count("periods", len(periods))
+
+    # Multi-year packages are spread per period and underwritten on the most
+    # recent one alone: a field that period lacks stays empty rather than
+    # borrowing another year's figure. Single-period statements keep the flat
+    # financials object.
+    spread = None
+    if len(periods) > 1:
+        spread = spread_financials(periods)
+        latest = periods[spread["periods"][-1]]
+        parsed.update({key: latest.get(key) for key in SPREAD_FIELDS})
 
     gross = parsed.get("gross_revenue")
     opex = parsed.get("operating_expenses")
@@ -90,16 +605,7 @@ def main():
     if ebitda is not None and debt_service not in (None, 0):
         dscr = ebitda / debt_service
 
-    decision = None
-    if dscr is not None:
-        if dscr > 1.25:
-            decision = "APPROVE"
-        elif dscr < 1.0:
-            decision = "DECLINE"
-        else:
-            decision = "REVIEW"
-    else:
-        decision = "REVIEW"
+    decision = decide(dscr)
 
     regulatory_flags = dossier.get("regulatory_flags") or []
     if isinstance(regulatory_flags, list) and "CRITICAL" in regulatory_flags:
@@ -109,6 +615,12 @@ def main():
     if not isinstance(financials_obj, dict):
         financials_obj = {}
 
+    # Figures from an earlier run may belong to another statement or period.
+    for key in DERIVED_FIELDS:
+        financials_obj.pop(key, None)
+    if spread is not None:
+        financials_obj["period"] = spread["periods"][-1]
+
     if gross is not None:
         financials_obj["gross_revenue"] = gross
     if opex is not None:
@@ -122,11 +634,26 @@ def main():
     if dscr is not None:
         financials_obj["dscr"] = dscr
 
+    basis = ""
+    spread_note = ""
+    if spread is not None:
+        basis = f"- Period: {spread['periods'][-1]} (most recent; other periods below)\n"
+        financials_obj.update(spread)
+        spread_note = (
+            f"\n- Periods spread: {', '.join(spread['periods'])}"
+            f"\n- Trailing DSCR ({spread['periods'][-1]}): {format_ratio(spread['trailing_dscr'])}"
+            f"\n- Average DSCR: {format_ratio(spread['average_dscr'])}"
+            f"\n- Revenue growth: "
+            + ", ".join(
+                f"{period} {format_percent(rate)}"
+                for period, rate in zip(spread["periods"][1:], spread["revenue_growth"][1:])
+            )
+            + f" (CAGR {format_percent(spread['revenue_cagr'])})"
+        )
+
     dossier["financials"] = financials_obj
     dossier["credit_decision"] = decision
 
-    DOSSIER_PATH.write_text(json.dumps(dossier, indent=2) + "\n", encoding="utf-8")
-
     business_name = dossier.get("entity_name", "Business")
     industry = dossier.get("industry", "Not specified")
 
@@ -140,12 +667,12 @@ def main():
 - Industry: {industry}
 
 ## 3) Financial Analysis
-- Gross Revenue: {format_money(gross)}
+{basis}- Gross Revenue: {format_money(gross)}
 - Operating Expenses: {format_money(opex)}
 - Depreciation (add-back): {format_money(depreciation)}
 - EBITDA: {format_money(ebitda)}
 - Annual Debt Service: {format_money(debt_service)}
-- DSCR: {format_ratio(dscr)}
+- DSCR: {format_ratio(dscr)}{spread_note}
 
 Depreciation is treated as a non-cash expense and added back to operating earnings when calculating EBITDA.
 
@@ -163,11 +690,21 @@ Depreciation is treated as a non-cash expense and added back to operating earnin
 **Suggested Covenant:** Maintain DSCR > 1.25x.
 """
 
-    MEMO_PATH.write_text(memo, encoding="utf-8")
+    with instrumentation.stage("write_memo"):
+        memo_path.write_text(memo, encoding="utf-8")
+
+    print(f"EBITDA: {format_money(ebitda)}", file=out)
+    print(f"DSCR: {format_ratio(dscr)}", file=out)
+    print(f"Decision: {decision}", file=out)
+
+    return dossier
 
-    print(f"EBITDA: {format_money(ebitda)}")
-    print(f"DSCR: {format_ratio(dscr)}")
-    print(f"Decision: {decision}")
+
+def main():
+    with instrumentation.agent("risk"), dossier_store.FileStore(DOSSIER_PATH).lock():
+        dossier = run(load_json(DOSSIER_PATH))
+        with instrumentation.stage("write_dossier"):
+            dossier_patch.write_result(DOSSIER_PATH, dossier, PATCH_OPS)
 
 
 if __name__ == "__main__":
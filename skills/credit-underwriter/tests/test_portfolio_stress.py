@@ -0,0 +1,41 @@
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "skills" / "credit-underwriter" / "scripts"))
+import portfolio_stress  # noqa: E402
+
+LOANS = [
+    {"gross_revenue": 5e6, "operating_expenses": 3.6e6, "depreciation": 2.5e5, "annual_debt_service": 9e5, "blocked": False},
+    {"gross_revenue": 4e6, "operating_expenses": 3e6, "depreciation": 1e5, "annual_debt_service": 0.0, "blocked": False},
+    {"gross_revenue": None, "operating_expenses": 3e6, "depreciation": 1e5, "annual_debt_service": 5e5, "blocked": True},
+]
+SCENARIOS = [
+    {"name": "base", "revenue": 1.0, "opex": 1.0, "debt_service": 1.0},
+    {"name": "no debt", "revenue": 1.0, "opex": 1.0, "debt_service": 0.0},
+    {"name": "downturn", "revenue": 0.8, "opex": 1.1, "debt_service": 1.2},
+]
+
+
+def same(left, right) -> bool:
+    return (math.isnan(left) and math.isnan(right)) or left == pytest.approx(right)
+
+
+def test_zero_stressed_debt_service_is_undefined_not_an_error():
+    grid = portfolio_stress.stress_grid_lists(LOANS, SCENARIOS)
+    assert math.isnan(grid["dscr"][0][1])
+    assert grid["decision"][0][1] == portfolio_stress.DECISIONS.index("REVIEW")
+    assert grid["dscr"][0][0] == pytest.approx(1_650_000 / 900_000)
+
+
+@pytest.mark.skipif(portfolio_stress.np is None, reason="NumPy not installed")
+def test_backends_agree():
+    lists = portfolio_stress.stress_grid_lists(LOANS, SCENARIOS)
+    arrays = portfolio_stress.grid_lists(portfolio_stress.stress_grid(LOANS, SCENARIOS))
+    for key in ("ebitda", "dscr"):
+        for left_row, right_row in zip(lists[key], arrays[key]):
+            assert all(same(left, right) for left, right in zip(left_row, right_row))
+    assert lists["decision"] == arrays["decision"]
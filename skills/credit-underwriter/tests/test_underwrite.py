@@ -0,0 +1,224 @@
+import functools
+import io
+import math
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "skills" / "credit-underwriter" / "scripts"))
+import underwrite  # noqa: E402
+
+DOCS = ROOT / "docs"
+DEBUG_EXTRACT = DOCS / "incoming" / "_debug_financials_extracted.txt"
+APEX_WORKBOOKS = [
+    ROOT / "assets" / "Apex_Logistics_Financial_Package_DSCR_Above_1_5.xlsx",
+    ROOT / "assets" / "Apex_Logistics_Financial_Package_DSCR_Below_1.xlsx",
+    ROOT / "assets" / "Apex_Logistics_Financial_Package_fixed.xlsx",
+    DOCS / "incoming" / "Apex_Logistics_Financial_Package_fixed.xlsx",
+]
+
+# gross_revenue, operating_expenses, depreciation, annual_debt_service, decision
+STATEMENTS = {
+    "financials.txt": (5_000_000, 3_600_000, 250_000, 900_000, "APPROVE"),
+    "clients/fx-only/financials.txt": (6_400_000, 4_200_000, 300_000, 950_000, "APPROVE"),
+    "clients/greenline-logistics/financials.txt": (5_200_000, 3_700_000, 280_000, 900_000, "APPROVE"),
+    "clients/low-dscr/financials.txt": (4_100_000, 3_900_000, 120_000, 420_000, "DECLINE"),
+    "clients/no-ubo/financials.txt": (3_200_000, 2_450_000, 180_000, 650_000, "APPROVE"),
+    "clients/prime-estates/financials.txt": (9_800_000, 6_500_000, 450_000, 1_400_000, "APPROVE"),
+}
+
+MULTI_PERIOD = """Apex Test Co - Financial Package
+Coverage: Historical FY2023-FY2024 and YTD 2025
+Line Item: FY2023 | FY2024
+Gross Revenue: $1,000,000 | $1,200,000
+Linehaul Revenue: $600,000 | $700,000
+Operating Expenses: $700,000 | $800,000
+OpEx Ratio: 0.70 | 0.67
+Depreciation & Amortization: $50,000 | $60,000
+Total Annual Debt Service: $200,000
+"""
+
+
+def underwrite_file(path: Path, tmp_path: Path, dossier=None) -> dict:
+    return underwrite.run(dict(dossier or {}), path, tmp_path / "Credit_Memo.md", out=io.StringIO())
+
+
+@pytest.mark.parametrize("name", sorted(STATEMENTS))
+def test_docs_statements(name, tmp_path):
+    gross, opex, depreciation, debt_service, decision = STATEMENTS[name]
+    dossier = underwrite_file(DOCS / name, tmp_path)
+    financials = dossier["financials"]
+    assert financials["gross_revenue"] == gross
+    assert financials["operating_expenses"] == opex
+    assert financials["depreciation"] == depreciation
+    assert financials["annual_debt_service"] == debt_service
+    assert financials["ebitda"] == gross - opex + depreciation
+    assert financials["dscr"] == pytest.approx((gross - opex + depreciation) / debt_service)
+    assert dossier["credit_decision"] == decision
+    # One fiscal period: no spread.
+    assert "periods" not in financials
+
+
+def test_spread_single_period_statement():
+    periods = underwrite.spread_periods((DOCS / "financials.txt").read_text(encoding="utf-8").splitlines())
+    assert periods == {
+        "FY2024": {
+            "gross_revenue": 5_000_000,
+            "operating_expenses": 3_600_000,
+            "depreciation": 250_000,
+            "annual_debt_service": 900_000,
+            "proposed_loan_amount": 1_500_000,
+        }
+    }
+
+
+def test_spread_ignores_periods_in_prose():
+    # "Coverage: Historical 2023A-2025A and YTD 2026" and "~$100M annual
+    # revenue (2025A synthetic target)" name periods inside sentences; the
+    # only real header is the single-column "Line Item: 2023A", under which
+    # the totals are blank and only D&A has an amount.
+    periods = underwrite.spread_periods(DEBUG_EXTRACT.read_text(encoding="utf-8").splitlines())
+    assert periods == {"FY2023": {"depreciation": 2096}}
+
+
+def test_debug_extract_is_not_spread(tmp_path):
+    financials = underwrite_file(DEBUG_EXTRACT, tmp_path)["financials"]
+    for key in ("period", "periods", "by_period", "trailing_dscr"):
+        assert key not in financials
+
+
+@pytest.mark.parametrize("size", [1, 64, 1 << 20])
+@pytest.mark.parametrize("source", ["financials.txt", "clients/low-dscr/financials.txt", "debug", "multi"])
+def test_streamed_scan_matches_whole_text(tmp_path, size, source):
+    if source == "multi":
+        path = tmp_path / "multi.txt"
+        path.write_text(MULTI_PERIOD, encoding="utf-8")
+    else:
+        path = DEBUG_EXTRACT if source == "debug" else DOCS / source
+    text = path.read_text(encoding="utf-8")
+    parsed, periods = underwrite.scan_statement(underwrite.iter_blocks(path, size))
+    assert parsed == underwrite.extract_fields(text)
+    assert periods == underwrite.spread_periods(text.splitlines())
+
+
+def test_spread_columns():
+    periods = underwrite.spread_periods(MULTI_PERIOD.splitlines())
+    assert periods == {
+        "FY2023": {
+            "gross_revenue": 1_000_000,
+            "operating_expenses": 700_000,
+            "depreciation": 50_000,
+            "annual_debt_service": 200_000,
+        },
+        "FY2024": {"gross_revenue": 1_200_000, "operating_expenses": 800_000, "depreciation": 60_000},
+    }
+
+
+def test_decision_uses_latest_period_only(tmp_path):
+    path = tmp_path / "financials.txt"
+    path.write_text(MULTI_PERIOD, encoding="utf-8")
+    stale = {"financials": {"annual_debt_service": 1.0, "dscr": 9.9}}
+    dossier = underwrite_file(path, tmp_path, stale)
+    financials = dossier["financials"]
+    assert financials["period"] == "FY2024"
+    assert financials["periods"] == ["FY2023", "FY2024"]
+    assert financials["gross_revenue"] == 1_200_000
+    assert financials["ebitda"] == 460_000
+    # FY2024 reports no debt service; FY2023's is not borrowed, and the
+    # stale figures from an earlier run are gone.
+    assert "annual_debt_service" not in financials
+    assert "dscr" not in financials
+    assert financials["by_period"]["dscr"] == [pytest.approx(1.75), None]
+    assert dossier["credit_decision"] == "REVIEW"
+    memo = (tmp_path / "Credit_Memo.md").read_text(encoding="utf-8")
+    assert "- Period: FY2024" in memo
+    assert "- Annual Debt Service: Not provided" in memo
+
+
+@pytest.mark.parametrize("path", APEX_WORKBOOKS, ids=lambda path: f"{path.parent.name}/{path.name}")
+def test_apex_workbook_spread(path):
+    parsed, periods = underwrite.extract_table(underwrite.iter_table_rows(path))
+    # Total Revenue, Total Operating Costs and Annual Debt Service are
+    # formulas saved without cached values: they stay empty instead of
+    # falling back to "Linehaul Revenue" or the "OpEx Ratio" assumption.
+    assert parsed == {
+        "gross_revenue": None,
+        "operating_expenses": None,
+        "depreciation": 2_096_000,
+        "annual_debt_service": None,
+        "proposed_loan_amount": None,
+    }
+    # P&L is reported in $000.
+    assert periods == {
+        "FY2023": {"depreciation": 2_096_000},
+        "FY2024": {"depreciation": 2_232_000},
+        "FY2025": {"depreciation": 2_415_000},
+    }
+
+
+def test_uncached_formulas_read_as_nan():
+    rows = {
+        row[0]: row
+        for sheet, row in underwrite.iter_table_rows(APEX_WORKBOOKS[0])
+        if sheet == "P&L" and row and isinstance(row[0], str)
+    }
+    assert all(math.isnan(cell) for cell in rows["Total Revenue"][1:5])
+    assert rows["Linehaul Revenue"][1:4] == [60137, 66059, 71982]
+
+
+def test_apex_workbook_underwriting(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        underwrite, "load_financials_table", functools.partial(underwrite.load_financials_table, cache_dir=tmp_path)
+    )
+    dossier = underwrite_file(APEX_WORKBOOKS[0], tmp_path)
+    financials = dossier["financials"]
+    assert financials["period"] == "FY2025"
+    assert financials["depreciation"] == 2_415_000
+    for key in ("gross_revenue", "operating_expenses", "ebitda", "annual_debt_service", "dscr"):
+        assert key not in financials
+    assert dossier["credit_decision"] == "REVIEW"
+
+
+def test_csv_table(tmp_path):
+    path = tmp_path / "financials.csv"
+    path.write_text(
+        "Summary,,\n"
+        "Reporting Currency,USD ($000),\n"
+        "Line Item,FY2023,FY2024\n"
+        "Revenue,,\n"
+        "Linehaul Revenue,600,700\n"
+        "Total Revenue,\"1,000\",\"1,200\"\n"
+        "Operating Expenses,700,800\n"
+        "OpEx Ratio,0.7,%\n"
+        "Depreciation & Amortization,50,60\n"
+        "Total Annual Debt Service,200,250\n",
+        encoding="utf-8",
+    )
+    parsed, periods = underwrite.load_financials_table(path, cache_dir=tmp_path / "cache")
+    assert parsed["gross_revenue"] == 1_000_000
+    assert parsed["operating_expenses"] == 700_000
+    assert parsed["depreciation"] == 50_000
+    assert parsed["annual_debt_service"] == 200_000
+    assert periods["FY2024"] == {
+        "gross_revenue": 1_200_000,
+        "operating_expenses": 800_000,
+        "depreciation": 60_000,
+        "annual_debt_service": 250_000,
+    }
+    # The second load comes from the content-hash cache.
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+    assert underwrite.load_financials_table(path, cache_dir=tmp_path / "cache") == (parsed, periods)
+
+
+def test_thousands_scale_is_per_sheet():
+    rows = [
+        ("Cover", ["Reporting Currency", "USD ($000 unless noted)"]),
+        ("Summary", ["Gross Revenue", 5_000_000.0]),
+        ("P&L", ["Historical (USD $000)"]),
+        ("P&L", ["Depreciation", 250.0]),
+    ]
+    parsed, _ = underwrite.extract_table(rows)
+    assert parsed["gross_revenue"] == 5_000_000
+    assert parsed["depreciation"] == 250_000
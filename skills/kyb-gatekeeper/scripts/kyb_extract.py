@@ -6,6 +6,16 @@ import sys
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[3]
+SHARED_DIR = ROOT / "skills" / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+import instrumentation  # noqa: E402
+import dossier_patch  # noqa: E402
+import dossier_store  # noqa: E402
+SCRIPT_DIR = Path(__file__).resolve().parent
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+from ownership_graph import OwnershipGraph  # noqa: E402
 ARTICLES_PATH = Path(os.environ.get("KYB_ARTICLES_PATH", ROOT / "docs" / "articles_inc.txt"))
 DOSSIER_PATH = Path(
     os.environ.get(
@@ -13,24 +23,42 @@ DOSSIER_PATH = Path(
         os.environ.get("KYB_DOSSIER_PATH", ROOT / "company_dossier.json"),
     )
 )
+# Articles of the applicant's holding companies (files or directories of
+# .txt files); when given, UBOs are resolved through the ownership chain.
+RELATED_ARTICLES = [Path(p) for p in os.environ.get("KYB_RELATED_ARTICLES", "").split(os.pathsep) if p]
+UBO_THRESHOLD = 25
 
 ENTITY_NAME_RE = re.compile(r"\bENTITY\s+NAME\b\s*[:\-]\s*(.+)", re.IGNORECASE)
 STATE_RE = re.compile(r"\bSTATE\s+OF\s+REGISTRATION\b\s*[:\-]\s*(.+)", re.IGNORECASE)
 ENTITY_HINT_RE = re.compile(r"\b([A-Z][A-Za-z0-9&.,'\- ]+\b(?:LLC|L\.L\.C\.|CORP|CORPORATION|INC|INC\.|LTD|L\.T\.D\.))\b", re.IGNORECASE)
 PCT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+BULLET_RE = re.compile(r"^[\s\-*\u2022]+")
+OWNERSHIP_PAREN_RE = re.compile(r"\([^)]*%[^)]*\)")
+OWNER_LABEL_RE = re.compile(r"\bOWNER\b\s*[:\-]\s*(.+)", re.IGNORECASE)
 
+# Dossier keys this agent writes and how the autopilot merges them.
+PATCH_OPS = {
+    "entity_name": "set",
+    "state": "set",
+    "ubo_list": "set",
+    "kyb_status": "set",
+    "regulatory_flags": "union",
+}
 
-def read_text(path: Path) -> str:
-    return path.read_text(encoding="utf-8", errors="replace")
 
+def read_lines(path: Path):
+    # Yields the same lines as str.splitlines() on the whole text, without
+    # holding long operating agreements in memory.
+    with path.open(encoding="utf-8", errors="replace") as handle:
+        for chunk in handle:
+            yield from chunk.splitlines()
 
-def read_articles_text() -> str:
+
+def read_articles_lines(path: Path = ARTICLES_PATH):
     if os.environ.get("KYB_USE_STDIN") == "1":
         data = sys.stdin.buffer.read()
-        if not data:
-            return ""
-        return data.decode("utf-8", errors="replace")
-    return read_text(ARTICLES_PATH)
+        return iter(data.decode("utf-8", errors="replace").splitlines())
+    return read_lines(path)
 
 
 def load_json(path: Path) -> dict:
@@ -40,45 +68,22 @@ def load_json(path: Path) -> dict:
 
 
 def strip_bullets(line: str) -> str:
-    return re.sub(r"^[\s\-*\u2022]+", "", line).strip()
-
-
-def extract_entity_name(text: str):
-    for line in text.splitlines():
-        m = ENTITY_NAME_RE.search(line)
-        if m:
-            return m.group(1).strip(), "explicit"
-    # fallback: infer from first strong match near entity type hints
-    for line in text.splitlines():
-        m = ENTITY_HINT_RE.search(line)
-        if m:
-            return m.group(1).strip(), "inferred"
-    return None, None
+    return BULLET_RE.sub("", line).strip()
 
 
-def extract_state(text: str):
-    for line in text.splitlines():
-        m = STATE_RE.search(line)
-        if m:
-            return m.group(1).strip(), "explicit"
-    return None, None
-
-
-def parse_ubo_line(line: str):
-    m_pct = PCT_RE.search(line)
+def parse_holding_line(line: str, m_pct=None):
+    m_pct = m_pct or PCT_RE.search(line)
     if not m_pct:
         return None
     pct = float(m_pct.group(1))
-    if pct <= 25:
-        return None
 
     cleaned = strip_bullets(line)
 
     # Remove parenthetical that contains ownership percentage
-    cleaned = re.sub(r"\([^)]*%[^)]*\)", "", cleaned).strip()
+    cleaned = OWNERSHIP_PAREN_RE.sub("", cleaned).strip()
 
     # Prefer content after labels like "Owner:" or "Beneficial Owner:"
-    label_match = re.search(r"\bOWNER\b\s*[:\-]\s*(.+)", cleaned, re.IGNORECASE)
+    label_match = OWNER_LABEL_RE.search(cleaned)
     if label_match:
         cleaned = label_match.group(1).strip()
 
@@ -114,15 +119,70 @@ def parse_ubo_line(line: str):
     }
 
 
-def build_ubo_list(text: str):
-    ubo_list = []
-    for line in text.splitlines():
-        if not PCT_RE.search(line):
-            continue
-        ubo = parse_ubo_line(line)
-        if ubo:
-            ubo_list.append(ubo)
-    return ubo_list
+def scan_articles(lines) -> dict:
+    """Entity name, state, holdings and UBOs over 25% from one pass over the lines.
+
+    The first ENTITY NAME / STATE OF REGISTRATION line wins ("explicit");
+    without an explicit name, the first line that looks like an entity
+    ("... LLC", "... Inc.") is used ("inferred").
+    """
+    entity_name = entity_conf = state = state_conf = hint = None
+    holdings = []
+    for line in lines:
+        if entity_name is None:
+            m = ENTITY_NAME_RE.search(line)
+            if m:
+                entity_name, entity_conf = m.group(1).strip(), "explicit"
+            elif hint is None:
+                m = ENTITY_HINT_RE.search(line)
+                if m:
+                    hint = m.group(1).strip()
+        if state is None:
+            m = STATE_RE.search(line)
+            if m:
+                state, state_conf = m.group(1).strip(), "explicit"
+        # PCT_RE has no literal prefix to skip ahead on; test for "%" first.
+        m_pct = PCT_RE.search(line) if "%" in line else None
+        if m_pct:
+            holding = parse_holding_line(line, m_pct)
+            if holding:
+                holdings.append(holding)
+    if entity_name is None and hint is not None:
+        entity_name, entity_conf = hint, "inferred"
+    return {
+        "entity_name": entity_name,
+        "entity_conf": entity_conf,
+        "state": state,
+        "state_conf": state_conf,
+        "holdings": holdings,
+        "ubo_list": [holding for holding in holdings if holding["ownership_pct"] > UBO_THRESHOLD],
+    }
+
+
+def related_documents(paths):
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.glob("*.txt"))
+        elif path.exists():
+            yield path
+
+
+def resolve_ubos(entity_name: str, holdings: list, related_paths) -> tuple:
+    """UBOs over 25% by effective ownership through the related articles.
+
+    Returns the UBO list (each with its strongest ``ownership_path``) and
+    any ownership cycles found.
+    """
+    graph = OwnershipGraph()
+    graph.add_entity(entity_name, holdings)
+    for path in related_documents(related_paths):
+        found = scan_articles(read_lines(path))
+        name = found["entity_name"]
+        # A second document for an entity already declared would double its holders.
+        if name and not graph.declares(name):
+            graph.add_entity(name, found["holdings"])
+    owners = graph.effective_owners(entity_name)
+    return [owner for owner in owners if owner["ownership_pct"] > UBO_THRESHOLD], graph.cycles
 
 
 def update_field(dossier: dict, key: str, value, confidence: str, existing_confidence_required: bool = False):
@@ -139,13 +199,19 @@ def update_field(dossier: dict, key: str, value, confidence: str, existing_confi
         return
 
 
-def main():
-    articles_text = read_articles_text()
-    dossier = load_json(DOSSIER_PATH)
-
-    entity_name, entity_conf = extract_entity_name(articles_text)
-    state, state_conf = extract_state(articles_text)
-    ubo_list = build_ubo_list(articles_text)
+def run(dossier: dict, articles_path: Path = ARTICLES_PATH, related_paths=None, out=None) -> dict:
+    # Reading is interleaved with extraction, so both land in one stage.
+    with instrumentation.stage("extract"):
+        found = scan_articles(read_articles_lines(articles_path))
+    entity_name, entity_conf = found["entity_name"], found["entity_conf"]
+    state, state_conf = found["state"], found["state_conf"]
+    ubo_list = found["ubo_list"]
+    cycles = []
+    related_paths = RELATED_ARTICLES if related_paths is None else related_paths
+    if related_paths and entity_name:
+        with instrumentation.stage("ownership_graph"):
+            ubo_list, cycles = resolve_ubos(entity_name, found["holdings"], related_paths)
+    instrumentation.count("ubos_found", len(ubo_list))
 
     update_field(dossier, "entity_name", entity_name, entity_conf)
     update_field(dossier, "state", state, state_conf)
@@ -165,6 +231,10 @@ def main():
     if not ubo_list:
         missing_flags.append("NO_UBO_OVER_25")
 
+    # A cycle does not reject KYB on its own, but needs a manual look.
+    if cycles and "OWNERSHIP_CYCLE" not in flags:
+        flags.append("OWNERSHIP_CYCLE")
+
     if missing_flags:
         dossier["kyb_status"] = "REJECTED"
         for flag in missing_flags:
@@ -175,15 +245,27 @@ def main():
 
     dossier["regulatory_flags"] = flags
 
-    DOSSIER_PATH.write_text(json.dumps(dossier, indent=2, sort_keys=False) + "\n", encoding="utf-8")
-
     # Log summary
-    print(f"entity_name: {entity_name or 'N/A'}")
-    print(f"state: {state or 'N/A'}")
-    print(f"ubos_over_25: {len(ubo_list)}")
-    print(f"kyb_status: {dossier.get('kyb_status')}")
+    print(f"entity_name: {entity_name or 'N/A'}", file=out)
+    print(f"state: {state or 'N/A'}", file=out)
+    print(f"ubos_over_25: {len(ubo_list)}", file=out)
+    indirect = [ubo for ubo in ubo_list if len(ubo.get("ownership_path") or []) > 2]
+    if indirect:
+        print(f"indirect_ubos: {len(indirect)}", file=out)
+    for owner, holder in cycles:
+        print(f"ownership_cycle: {owner} <- {holder}", file=out)
+    print(f"kyb_status: {dossier.get('kyb_status')}", file=out)
     if missing_flags:
-        print(f"flags: {', '.join(missing_flags)}")
+        print(f"flags: {', '.join(missing_flags)}", file=out)
+
+    return dossier
+
+
+def main():
+    with instrumentation.agent("kyb"), dossier_store.FileStore(DOSSIER_PATH).lock():
+        dossier = run(load_json(DOSSIER_PATH))
+        with instrumentation.stage("write_dossier"):
+            dossier_patch.write_result(DOSSIER_PATH, dossier, PATCH_OPS)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Effective ownership through chains of holding companies.
+
+Each articles document declares one entity and the holders of its shares.
+A holder that is itself declared by another document is an intermediate
+entity; any other holder (a person, or a company whose articles were not
+supplied) is an ultimate owner. Effective ownership is the sum over every
+chain of the product of the percentages along it.
+"""
+
+
+def entity_key(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class OwnershipGraph:
+    def __init__(self):
+        self.names = {}
+        self.holders = {}
+        self.roles = {}
+        self.cycles = []
+
+    def add_entity(self, name: str, holdings):
+        """Declare ``name`` with its holders (dicts with name, role and ownership_pct)."""
+        key = entity_key(name)
+        self.names.setdefault(key, name)
+        edges = self.holders.setdefault(key, [])
+        for holding in holdings:
+            holder = entity_key(holding["name"])
+            self.names.setdefault(holder, holding["name"])
+            self.roles.setdefault(holder, holding.get("role"))
+            edges.append((holder, holding["ownership_pct"] / 100))
+
+    def declares(self, name: str) -> bool:
+        return entity_key(name) in self.holders
+
+    def _order(self, root: str) -> list:
+        # Entities reachable from root, each before its own holders (reverse
+        # DFS post-order). Back edges close a cycle; they are recorded and
+        # left out of the order. Iterative, so deep chains do not hit the
+        # recursion limit.
+        state = {root: "open"}
+        post_order = []
+        stack = [(root, iter(self.holders[root]))]
+        while stack:
+            key, holders = stack[-1]
+            for holder, _ in holders:
+                if holder not in self.holders:
+                    continue
+                seen = state.get(holder)
+                if seen is None:
+                    state[holder] = "open"
+                    stack.append((holder, iter(self.holders[holder])))
+                    break
+                if seen == "open":
+                    self.cycles.append([self.names[key], self.names[holder]])
+            else:
+                stack.pop()
+                state[key] = "done"
+                post_order.append(key)
+        post_order.reverse()
+        return post_order
+
+    def effective_owners(self, name: str) -> list:
+        """Ultimate owners of ``name`` with effective percentage and strongest chain.
+
+        Fractions are pushed from ``name`` up through its holders in
+        topological order, so each entity's share (the sum of the path
+        products reaching it) is computed once however many chains run
+        through it. ``ownership_path`` is the single chain with the largest
+        product, from the owner to ``name``.
+        """
+        root = entity_key(name)
+        if root not in self.holders:
+            return []
+        order = self._order(root)
+        position = {key: index for index, key in enumerate(order)}
+        share = {root: 1.0}
+        best = {root: (1.0, None)}
+        owners = {}
+        for key in order:
+            for holder, fraction in self.holders[key]:
+                if holder in position and position[holder] <= position[key]:
+                    continue  # cycle edge, reported by _order
+                share[holder] = share.get(holder, 0.0) + share[key] * fraction
+                product = best[key][0] * fraction
+                if holder not in best or product > best[holder][0]:
+                    best[holder] = (product, key)
+                if holder not in self.holders:
+                    owners.setdefault(holder, None)
+        results = []
+        for owner in owners:
+            path = [owner]
+            while best[path[-1]][1] is not None:
+                path.append(best[path[-1]][1])
+            results.append({
+                "name": self.names[owner],
+                "role": self.roles.get(owner),
+                "ownership_pct": round(share[owner] * 100, 4),
+                "ownership_path": [self.names[key] for key in path],
+            })
+        return results
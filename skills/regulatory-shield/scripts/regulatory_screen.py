@@ -1,13 +1,28 @@
 #!/usr/bin/env python3
+import hashlib
 import json
+import pickle
 import re
+import sys
+import tempfile
 from pathlib import Path
 
 import os
 
 ROOT = Path(__file__).resolve().parents[3]
+SHARED_DIR = ROOT / "skills" / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+import instrumentation  # noqa: E402
+import dossier_patch  # noqa: E402
+import dossier_store  # noqa: E402
 DOSSIER_PATH = Path(os.environ.get("DOSSIER_PATH", ROOT / "company_dossier.json"))
-SANCTIONS_PATH = ROOT / "data" / "sanctions_list.txt"
+SANCTIONS_PATH = Path(os.environ.get("SANCTIONS_PATH", ROOT / "data" / "sanctions_list.txt"))
+SANCTIONS_CACHE_DIR = Path(os.environ.get("SANCTIONS_CACHE_DIR", ROOT / ".cache" / "sanctions"))
+# Bump when SanctionsIndex's layout changes so stale pickles are ignored.
+INDEX_CACHE_VERSION = 2
+# Optional fuzzy tier: a similarity in (0, 1]; unset or 0 disables it.
+FUZZY_THRESHOLD = float(os.environ.get("SANCTIONS_FUZZY_THRESHOLD") or 0)
 
 PROHIBITED_INDUSTRIES = {
     "cannabis": ["cannabis", "marijuana", "thc", "weed"],
@@ -17,6 +32,19 @@ PROHIBITED_INDUSTRIES = {
     "sanctioned_jurisdictions": ["sanctioned", "jurisdiction"],
 }
 
+NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+WHITESPACE_RE = re.compile(r"\s+")
+NGRAM_SIZE = 3
+
+# Soundex digit classes; vowels (and y) separate repeated codes, h/w do not.
+SOUNDEX_TABLE = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyz",
+    "01230120022455012623010202",
+)
+
+# Dossier keys this agent writes and how the autopilot merges them.
+PATCH_OPS = {"regulatory_flags": "union", "compliance_summary": "set", "credit_decision": "set"}
+
 
 def load_json(path: Path) -> dict:
     if not path.exists():
@@ -26,8 +54,8 @@ def load_json(path: Path) -> dict:
 
 def normalize_name(value: str) -> str:
     value = value.lower()
-    value = re.sub(r"[^a-z0-9\s]", " ", value)
-    value = re.sub(r"\s+", " ", value).strip()
+    value = NON_ALNUM_RE.sub(" ", value)
+    value = WHITESPACE_RE.sub(" ", value).strip()
     return value
 
 
@@ -63,11 +91,210 @@ def sanctions_match(ubo_name: str, sanctions_name: str) -> bool:
     return False
 
 
-def load_sanctions(path: Path):
-    if not path.exists():
-        return []
+def ngrams(value: str, size: int = NGRAM_SIZE):
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def phonetic_key(token: str) -> str:
+    if not token or not token[0].isalpha():
+        return token
+    key = []
+    previous = token[0].translate(SOUNDEX_TABLE)
+    for char in token[1:]:
+        if char in "hw":
+            continue
+        code = char.translate(SOUNDEX_TABLE)
+        if code != previous and code in "123456":
+            key.append(code)
+        previous = code
+    return (token[0] + "".join(key) + "000")[:4]
+
+
+def bounded_distance(left: str, right: str, limit: int):
+    """Levenshtein distance, or None as soon as it must exceed ``limit``.
+
+    Only the diagonal band of width ``2 * limit + 1`` is filled in; cells
+    outside it cannot lead to a distance within the limit.
+    """
+    if abs(len(left) - len(right)) > limit:
+        return None
+    if left == right:
+        return 0
+    if len(left) > len(right):
+        left, right = right, left
+    width = len(left)
+    outside = limit + 1
+    previous = [column if column <= limit else outside for column in range(width + 1)]
+    for row in range(1, len(right) + 1):
+        right_char = right[row - 1]
+        low = max(1, row - limit)
+        high = min(width, row + limit)
+        current = [outside] * (width + 1)
+        current[0] = row if row <= limit else outside
+        best = current[0]
+        for column in range(low, high + 1):
+            value = previous[column - 1] + (left[column - 1] != right_char)
+            if previous[column] + 1 < value:
+                value = previous[column] + 1
+            if current[column - 1] + 1 < value:
+                value = current[column - 1] + 1
+            if value > outside:
+                value = outside
+            current[column] = value
+            if value < best:
+                best = value
+        if best > limit:
+            return None
+        previous = current
+    return previous[width] if previous[width] <= limit else None
+
+
+class SanctionsIndex:
+    """Prebuilt lookup structure equivalent to scanning ``sanctions_match``.
+
+    ``match`` returns the first list entry (in file order) that
+    ``sanctions_match`` would accept, without touching every entry:
+
+    - exact and "entry inside UBO name" hits come from looking up every
+      substring of the (short) UBO name in ``by_norm``;
+    - "UBO name inside entry" hits come from the trigram postings, verified
+      with a plain substring check;
+    - last name + first initial hits come from the ``by_last_initial`` bucket.
+
+    ``fuzzy_match`` is the optional edit-distance tier. Candidates are blocked
+    by the Soundex key of each name token and by normalised length, so only a
+    small bucket is ever scored.
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self.norms = []
+        self.by_norm = {}
+        self.by_last_initial = {}
+        self.postings = {}
+        self.phonetic = {}
+        for position, entry in enumerate(self.entries):
+            norm = normalize_name(entry)
+            self.norms.append(norm)
+            if not norm:
+                continue
+            self.by_norm.setdefault(norm, position)
+            parts = norm.split()
+            self.by_last_initial.setdefault((parts[-1], parts[0][0]), position)
+            for gram in ngrams(norm):
+                self.postings.setdefault(gram, []).append(position)
+            for key in {phonetic_key(part) for part in parts}:
+                self.phonetic.setdefault(key, {}).setdefault(len(norm), []).append(position)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def to_state(self) -> dict:
+        # Plain builtins only, so the cache loads no matter which module name
+        # this script was imported under.
+        return dict(self.__dict__)
+
+    @classmethod
+    def from_state(cls, state: dict):
+        index = cls.__new__(cls)
+        index.__dict__.update(state)
+        return index
+
+    def _first_containing(self, ubo_norm: str, limit: int):
+        # Postings are built in file order, so the first verified entry of the
+        # shortest posting list is the earliest entry containing ubo_norm.
+        if len(ubo_norm) < NGRAM_SIZE:
+            candidates = range(min(limit, len(self.norms)))
+        else:
+            lists = []
+            for gram in ngrams(ubo_norm):
+                posting = self.postings.get(gram)
+                if posting is None:
+                    return None
+                lists.append(posting)
+            candidates = min(lists, key=len)
+        for position in candidates:
+            if position >= limit:
+                break
+            if ubo_norm in self.norms[position]:
+                return position
+        return None
+
+    def match_position(self, ubo_name: str):
+        ubo_norm = normalize_name(ubo_name)
+        if not ubo_norm:
+            return None
+
+        best = len(self.entries)
+
+        # Exact match and sanctions name contained in the UBO name.
+        length = len(ubo_norm)
+        for start in range(length):
+            if ubo_norm[start] == " ":
+                continue
+            for end in range(start + 1, length + 1):
+                position = self.by_norm.get(ubo_norm[start:end])
+                if position is not None and position < best:
+                    best = position
+
+        position = self._first_containing(ubo_norm, best)
+        if position is not None:
+            best = position
+
+        parts = ubo_norm.split()
+        position = self.by_last_initial.get((parts[-1], parts[0][0]))
+        if position is not None and position < best:
+            best = position
+
+        return best if best < len(self.entries) else None
+
+    def match(self, ubo_name: str):
+        position = self.match_position(ubo_name)
+        if position is None:
+            return None
+        return self.entries[position]
+
+    def fuzzy_match(self, ubo_name: str, threshold: float):
+        """Return ``(entry, score)`` for the closest entry scoring >= threshold.
+
+        Score is ``1 - distance / max(len)`` on normalised names; ties go to the
+        earliest entry in the list.
+        """
+        ubo_norm = normalize_name(ubo_name)
+        if not ubo_norm or threshold <= 0:
+            return None
+
+        length = len(ubo_norm)
+        # Longest candidate that could still reach the threshold, and the
+        # matching edit budget; shorter candidates only need a smaller budget.
+        max_length = int(length / threshold) if threshold < 1 else length
+        seen = set()
+        best = None
+        for key in {phonetic_key(part) for part in ubo_norm.split()}:
+            by_length = self.phonetic.get(key)
+            if not by_length:
+                continue
+            for candidate_length in range(int(length * threshold), max_length + 1):
+                for position in by_length.get(candidate_length, ()):
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    longest = max(length, candidate_length)
+                    limit = int(longest * (1 - threshold) + 1e-9)
+                    distance = bounded_distance(ubo_norm, self.norms[position], limit)
+                    if distance is None:
+                        continue
+                    score = 1 - distance / longest
+                    if best is None or score > best[1] or (score == best[1] and position < best[0]):
+                        best = (position, score)
+        if best is None:
+            return None
+        return self.entries[best[0]], round(best[1], 4)
+
+
+def parse_sanctions(text: str):
     entries = []
-    for line in path.read_text(encoding="utf-8", errors="replace").splitlines():
+    for line in text.splitlines():
         value = line.strip()
         if not value or value.startswith("#"):
             continue
@@ -75,6 +302,100 @@ def load_sanctions(path: Path):
     return entries
 
 
+def load_sanctions(path: Path):
+    if not path.exists():
+        return []
+    return parse_sanctions(path.read_text(encoding="utf-8", errors="replace"))
+
+
+_index_memo = {}
+
+
+def _write_atomic(path: Path, data: bytes):
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+        os.replace(temp_name, path)
+    except BaseException:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+
+
+def _read_stamp(stamp_path: Path):
+    try:
+        return json.loads(stamp_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _load_pickle(index_path: Path):
+    try:
+        with index_path.open("rb") as handle:
+            state = pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        return None
+    if not isinstance(state, dict):
+        return None
+    return SanctionsIndex.from_state(state)
+
+
+def load_sanctions_index(path: Path = SANCTIONS_PATH, cache_dir: Path = SANCTIONS_CACHE_DIR) -> SanctionsIndex:
+    """Return the compiled index for ``path``, rebuilding only when it changed.
+
+    The index is pickled under ``cache_dir`` by the SHA-256 of the list, so
+    identical lists share one entry. A per-path stamp records size, mtime and
+    hash: an unchanged stat skips hashing entirely, and a touched-but-equal
+    file only costs a hash. Writes are atomic, so concurrent batch workers can
+    share the cache directory.
+    """
+    if not path.exists():
+        return SanctionsIndex([])
+
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    index = _index_memo.get(memo_key)
+    if index is not None:
+        return index
+
+    path_key = hashlib.sha256(memo_key[0].encode("utf-8")).hexdigest()[:16]
+    stamp_path = cache_dir / f"{path_key}.stamp.json"
+    stamp = _read_stamp(stamp_path)
+
+    digest = None
+    if stamp and stamp.get("size") == stat.st_size and stamp.get("mtime_ns") == stat.st_mtime_ns:
+        digest = stamp.get("sha256")
+
+    raw = None
+    if digest is None:
+        raw = path.read_bytes()
+        digest = hashlib.sha256(raw).hexdigest()
+
+    index_path = cache_dir / f"{digest}.v{INDEX_CACHE_VERSION}.pickle"
+    index = _load_pickle(index_path)
+    if index is None:
+        if raw is None:
+            raw = path.read_bytes()
+        index = SanctionsIndex(parse_sanctions(raw.decode("utf-8", errors="replace")))
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(index_path, pickle.dumps(index.to_state(), protocol=pickle.HIGHEST_PROTOCOL))
+        except OSError:
+            pass
+
+    new_stamp = {"path": memo_key[0], "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+    if stamp != new_stamp:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(stamp_path, json.dumps(new_stamp).encode("utf-8"))
+        except OSError:
+            pass
+
+    _index_memo[memo_key] = index
+    return index
+
+
 def match_prohibited_industry(business_type: str):
     if not business_type:
         return None
@@ -85,9 +406,14 @@ def match_prohibited_industry(business_type: str):
     return None
 
 
-def main():
-    dossier = load_json(DOSSIER_PATH)
-    sanctions = load_sanctions(SANCTIONS_PATH)
+def run(
+    dossier: dict,
+    sanctions_path: Path = SANCTIONS_PATH,
+    fuzzy_threshold: float = FUZZY_THRESHOLD,
+    out=None,
+) -> dict:
+    with instrumentation.stage("load_sanctions"):
+        sanctions_index = load_sanctions_index(sanctions_path)
     ubo_list = dossier.get("ubo_list") or []
 
     regulatory_flags = dossier.get("regulatory_flags")
@@ -102,14 +428,26 @@ def main():
     }
 
     sanctions_hits = []
-    for ubo in ubo_list:
-        ubo_name = ubo.get("name") if isinstance(ubo, dict) else None
-        if not ubo_name:
-            continue
-        for sanc_name in sanctions:
-            if sanctions_match(ubo_name, sanc_name):
-                sanctions_hits.append({"ubo_name": ubo_name, "matched_name": sanc_name})
-                break
+    with instrumentation.stage("screen"):
+        for ubo in ubo_list:
+            ubo_name = ubo.get("name") if isinstance(ubo, dict) else None
+            if not ubo_name:
+                continue
+            matched_name = sanctions_index.match(ubo_name)
+            if matched_name is not None:
+                sanctions_hits.append({"ubo_name": ubo_name, "matched_name": matched_name})
+                continue
+            if fuzzy_threshold > 0:
+                fuzzy = sanctions_index.fuzzy_match(ubo_name, fuzzy_threshold)
+                if fuzzy is not None:
+                    sanctions_hits.append({
+                        "ubo_name": ubo_name,
+                        "matched_name": fuzzy[0],
+                        "match_type": "fuzzy",
+                        "score": fuzzy[1],
+                    })
+    instrumentation.count("ubos_screened", len(ubo_list))
+    instrumentation.count("sanctions_hits", len(sanctions_hits))
 
     critical_found = False
 
@@ -143,11 +481,18 @@ def main():
     dossier["regulatory_flags"] = regulatory_flags
     dossier["compliance_summary"] = compliance_summary
 
-    DOSSIER_PATH.write_text(json.dumps(dossier, indent=2) + "\n", encoding="utf-8")
+    print(f"ubos_screened: {len(ubo_list)}", file=out)
+    print(f"industry_checked: {bool(business_type)}", file=out)
+    print(f"compliance_status: {compliance_summary['status']}", file=out)
+
+    return dossier
 
-    print(f"ubos_screened: {len(ubo_list)}")
-    print(f"industry_checked: {bool(business_type)}")
-    print(f"compliance_status: {compliance_summary['status']}")
+
+def main():
+    with instrumentation.agent("compliance"), dossier_store.FileStore(DOSSIER_PATH).lock():
+        dossier = run(load_json(DOSSIER_PATH))
+        with instrumentation.stage("write_dossier"):
+            dossier_patch.write_result(DOSSIER_PATH, dossier, PATCH_OPS)
 
 
 if __name__ == "__main__":
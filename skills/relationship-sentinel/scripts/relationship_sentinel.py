@@ -1,15 +1,75 @@
 #!/usr/bin/env python3
 import json
+import operator
 import os
 import re
+import sys
+import time
+from collections import namedtuple
+from itertools import islice
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # columnar detection falls back to plain lists
+    np = None
+
 ROOT = Path(__file__).resolve().parents[3]
-LOG_PATH = ROOT / "logs" / "transaction_stream.log"
+SHARED_DIR = ROOT / "skills" / "shared"
+if str(SHARED_DIR) not in sys.path:
+    sys.path.insert(0, str(SHARED_DIR))
+import instrumentation  # noqa: E402
+import dossier_patch  # noqa: E402
+import dossier_store  # noqa: E402
+import cancellation  # noqa: E402
+LOG_PATH = Path(os.environ.get("TRANSACTION_LOG_PATH", ROOT / "logs" / "transaction_stream.log"))
 DOSSIER_PATH = Path(os.environ.get("DOSSIER_PATH", ROOT / "company_dossier.json"))
-SALES_BRIEF_PATH = ROOT / "Sales_Brief.md"
+SALES_BRIEF_PATH = Path(os.environ.get("SALES_BRIEF_PATH", ROOT / "Sales_Brief.md"))
+# Incremental mode keeps a byte-offset checkpoint next to the dossier and only
+# processes transactions appended since the last run; follow mode polls for them.
+CHECKPOINT_PATH = Path(
+    os.environ.get("SENTINEL_CHECKPOINT_PATH", DOSSIER_PATH.with_suffix(".sentinel.json"))
+)
+INCREMENTAL = os.environ.get("SENTINEL_INCREMENTAL") == "1"
+FOLLOW = os.environ.get("SENTINEL_FOLLOW") == "1"
+POLL_SECONDS = float(os.environ.get("SENTINEL_POLL_SECONDS", "1.0"))
+# Batch mode evaluates the signal rules column-wise over chunks of records.
+BATCH = os.environ.get("SENTINEL_BATCH") == "1"
+BATCH_SIZE = int(os.environ.get("SENTINEL_BATCH_SIZE", "1024"))
+# Declarative signal rules; without the file the built-in rules are used.
+RULES_PATH = Path(
+    os.environ.get("SENTINEL_RULES_PATH", ROOT / "skills" / "relationship-sentinel" / "signal_rules.json")
+)
+RULE_TIMING = os.environ.get("SENTINEL_RULE_TIMING") == "1"
 
 LIQUIDITY_KEYWORDS = ["investment", "vc", "venture", "private equity", "pe"]
+LIQUIDITY_RE = re.compile("|".join(re.escape(keyword) for keyword in LIQUIDITY_KEYWORDS))
+LIQUIDITY_MIN_AMOUNT = 1_000_000
+# A log path of "-" reads the transaction stream from stdin.
+STDIN_PATH = "-"
+
+AMOUNT_RE = re.compile(r"-?\d+(?:\.\d+)?")
+
+# Parsed transaction with everything detect needs already normalised:
+# trigger resolved (id, transaction_id, then the raw line), amount as float
+# (or None), currency upper-cased, source lower-cased.
+Transaction = namedtuple("Transaction", ["trigger", "amount", "currency", "source"])
+
+# Slot per key the record is built from; keys are matched as in
+# parse_transaction (stripped, case-insensitive, last occurrence wins).
+RECORD_KEYS = {
+    "id": 0,
+    "transaction_id": 1,
+    "amount": 2,
+    "transaction_amount": 3,
+    "currency": 4,
+    "source": 5,
+    "raw": 6,
+}
+
+# Dossier keys this agent writes and how the autopilot merges them.
+# A union, so re-running over a log already on file adds no duplicates.
+PATCH_OPS = {"cross_sell_opportunities": "union"}
 
 
 def load_json(path: Path) -> dict:
@@ -24,11 +84,87 @@ def load_lines(path: Path):
     return path.read_text(encoding="utf-8", errors="replace").splitlines()
 
 
+def iter_lines(path: Path):
+    # Same line boundaries as str.splitlines(), one buffered line at a time,
+    # so the whole log is never held in memory. Works for FIFOs and stdin.
+    if str(path) == STDIN_PATH:
+        handle = open(sys.stdin.fileno(), encoding="utf-8", errors="replace", closefd=False)
+    elif path.exists():
+        handle = path.open(encoding="utf-8", errors="replace")
+    else:
+        return
+    with handle:
+        for raw in handle:
+            yield from raw.splitlines()
+
+
+def load_checkpoint(path: Path, log_path: Path) -> dict:
+    checkpoint = load_json(path)
+    if checkpoint.get("log_path") != str(log_path):
+        return {"log_path": str(log_path)}
+    return checkpoint
+
+
+def save_checkpoint(path: Path, checkpoint: dict):
+    temp_path = path.with_name(path.name + ".tmp")
+    temp_path.write_text(json.dumps(checkpoint, indent=2) + "\n", encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def iter_appended_lines(path: Path, checkpoint: dict):
+    """Yield lines appended after ``checkpoint["offset"]``, advancing it.
+
+    A different inode or a file shorter than the offset means the log was
+    rotated or truncated, so reading restarts from the top. A trailing line
+    without a newline is left for the next run.
+    """
+    if not path.exists():
+        return
+    stat = path.stat()
+    offset = checkpoint.get("offset", 0)
+    if checkpoint.get("inode") != stat.st_ino or stat.st_size < offset:
+        offset = 0
+    checkpoint["inode"] = stat.st_ino
+    checkpoint["size"] = stat.st_size
+    if offset == stat.st_size:
+        checkpoint["offset"] = offset
+        return
+    try:
+        with path.open("rb") as handle:
+            handle.seek(offset)
+            for raw in handle:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                yield from raw.decode("utf-8", errors="replace").splitlines()
+    finally:
+        checkpoint["offset"] = offset
+
+
+def opportunity_keys(dossier: dict):
+    existing = dossier.get("cross_sell_opportunities")
+    if not isinstance(existing, list):
+        return set()
+    return {
+        (item.get("signal"), item.get("trigger_transaction"))
+        for item in existing
+        if isinstance(item, dict)
+    }
+
+
+def iter_transactions(lines):
+    for line in lines:
+        if line.strip():
+            yield parse_record(line)
+
+
 def parse_amount(text: str):
     if text is None:
         return None
     cleaned = text.replace(",", "").replace("$", "")
-    match = re.search(r"-?\d+(?:\.\d+)?", cleaned)
+    if cleaned.isdecimal():
+        return float(cleaned)
+    match = AMOUNT_RE.search(cleaned)
     if not match:
         return None
     try:
@@ -48,32 +184,414 @@ def parse_transaction(line: str):
     return data
 
 
+def split_quoted(line: str):
+    parts = []
+    start = 0
+    in_quotes = False
+    for position, char in enumerate(line):
+        if char == '"':
+            in_quotes = not in_quotes
+        elif char == "," and not in_quotes:
+            parts.append(line[start:position])
+            start = position + 1
+    parts.append(line[start:])
+    return parts
+
+
+def parse_record(line: str) -> Transaction:
+    # Single pass over the key=value pairs, keeping only the fields detection
+    # uses. Double-quoted values may contain commas ("" escapes a quote).
+    quoted = '"' in line and line.count('"') % 2 == 0
+    values = [None] * len(RECORD_KEYS)
+    for part in split_quoted(line) if quoted else line.split(","):
+        key, sep, value = part.partition("=")
+        if not sep:
+            continue
+        key = key.strip()
+        slot = RECORD_KEYS.get(key)
+        if slot is None:
+            slot = RECORD_KEYS.get(key.lower())
+            if slot is None:
+                continue
+        value = value.strip()
+        if quoted and len(value) > 1 and value[0] == '"' and value[-1] == '"':
+            value = value[1:-1].replace('""', '"')
+        values[slot] = value
+    raw = values[6] if values[6] is not None else line.strip()
+    return Transaction(
+        values[0] or values[1] or raw,
+        parse_amount(values[2] or values[3]),
+        (values[4] or "").upper(),
+        (values[5] or "").lower(),
+    )
+
+
+def record_from_dict(tx: dict) -> Transaction:
+    return Transaction(
+        tx.get("id") or tx.get("transaction_id") or tx.get("raw"),
+        parse_amount(tx.get("amount") or tx.get("transaction_amount")),
+        (tx.get("currency") or "").upper(),
+        (tx.get("source") or "").lower(),
+    )
+
+
 def detect_signals(transactions):
-    signals = []
-    for tx in transactions:
-        amount = parse_amount(tx.get("amount") or tx.get("transaction_amount"))
-        currency = (tx.get("currency") or "").upper()
-        source = (tx.get("source") or "").lower()
-        trigger = tx.get("id") or tx.get("transaction_id") or tx.get("raw")
-
-        if amount is not None and amount > 1_000_000:
-            if any(keyword in source for keyword in LIQUIDITY_KEYWORDS):
-                signals.append({
-                    "signal": "LIQUIDITY_EVENT",
-                    "recommended_product": "Liquidity Management / Sweep Account",
-                    "trigger_transaction": trigger,
-                    "confidence": "HIGH",
-                })
+    return list(iter_signals(record_from_dict(tx) for tx in transactions))
 
-        if currency and currency != "USD":
-            signals.append({
-                "signal": "FX_EXPOSURE",
-                "recommended_product": "FX Forward Contracts",
-                "trigger_transaction": trigger,
-                "confidence": "HIGH",
-            })
 
-    return signals
+def liquidity_signal(trigger):
+    return {
+        "signal": "LIQUIDITY_EVENT",
+        "recommended_product": "Liquidity Management / Sweep Account",
+        "trigger_transaction": trigger,
+        "confidence": "HIGH",
+    }
+
+
+def fx_signal(trigger):
+    return {
+        "signal": "FX_EXPOSURE",
+        "recommended_product": "FX Forward Contracts",
+        "trigger_transaction": trigger,
+        "confidence": "HIGH",
+    }
+
+
+def iter_signals(records):
+    for trigger, amount, currency, source in records:
+        if amount is not None and amount > LIQUIDITY_MIN_AMOUNT:
+            if LIQUIDITY_RE.search(source):
+                yield liquidity_signal(trigger)
+
+        if currency and currency != "USD":
+            yield fx_signal(trigger)
+
+
+def keyword_hits(indices, sources):
+    # Sources repeat heavily within a batch, so the regex runs once per
+    # distinct string rather than once per row.
+    cache = {}
+    hits = []
+    for index in indices:
+        source = sources[index]
+        matched = cache.get(source)
+        if matched is None:
+            matched = cache[source] = LIQUIDITY_RE.search(source) is not None
+        if matched:
+            hits.append(index)
+    return hits
+
+
+def signal_rows(amounts, currencies, sources):
+    """Evaluate LIQUIDITY_EVENT and FX_EXPOSURE over a column batch.
+
+    Returns the ascending row indices hit by each rule. The keyword regex only
+    runs on rows that already clear the amount threshold.
+    """
+    if np is not None:
+        amount = np.array(amounts, dtype=float)  # None becomes NaN
+        large = np.flatnonzero(amount > LIQUIDITY_MIN_AMOUNT).tolist()
+        currency = np.array(currencies, dtype=object)
+        fx = np.flatnonzero((currency != "") & (currency != "USD")).tolist()
+        return keyword_hits(large, sources), fx
+
+    large = [
+        index for index, value in enumerate(amounts)
+        if value is not None and value > LIQUIDITY_MIN_AMOUNT
+    ]
+    fx = [index for index, currency in enumerate(currencies) if currency and currency != "USD"]
+    return keyword_hits(large, sources), fx
+
+
+def iter_signals_batch(records, batch_size: int = BATCH_SIZE):
+    # Built-in rules only, used when no rules file is configured. Same
+    # signals in the same order as iter_signals: per row, liquidity before
+    # FX. Chunking keeps memory bounded on long streams.
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            return
+        triggers, amounts, currencies, sources = zip(*chunk)
+        liquidity, fx = signal_rows(amounts, currencies, sources)
+        liquidity_set = set(liquidity)
+        fx_set = set(fx)
+        for index in sorted(liquidity_set | fx_set):
+            if index in liquidity_set:
+                yield liquidity_signal(triggers[index])
+            if index in fx_set:
+                yield fx_signal(triggers[index])
+
+
+NUMERIC_OPS = {"gt": ">", "ge": ">=", "lt": "<", "le": "<="}
+EQUALITY_OPS = {"eq": "==", "ne": "!="}
+# The same comparisons as callables, for column-wise evaluation.
+COMPARE = {
+    "gt": operator.gt, "ge": operator.ge, "lt": operator.lt, "le": operator.le,
+    "eq": operator.eq, "ne": operator.ne,
+}
+STRING_FIELDS = {"trigger", "currency", "source"}
+
+
+class RulePlan:
+    """Signal rules compiled into one generated function.
+
+    Rules come from a config file as predicates over ``Transaction`` fields
+    (``field``/``op``/``value`` leaves combined with ``all``/``any``/``not``).
+    Every row goes through a single pass that evaluates all rules in order.
+    A predicate used by more than one rule is computed at most once per row
+    and shared. ``hits`` counts matches per rule, and ``seconds`` accumulates
+    per-rule evaluation time when the plan is built with ``timed=True``.
+
+    ``iter_signals_batch`` evaluates the same rules column-wise over chunks
+    of records, with the same signals in the same order.
+    """
+
+    def __init__(self, rules, timed: bool = False):
+        self.rules = list(rules)
+        self.timed = timed
+        self.hits = [0] * len(self.rules)
+        self.seconds = [0.0] * len(self.rules)
+        self.source = self._compile()
+
+    def _compile(self):
+        self._constants = {}
+        self._predicates = {}
+        self._leaves = {}
+        self._uses = {}
+        conditions = []
+        for rule in self.rules:
+            if not rule.get("signal") or "when" not in rule:
+                raise ValueError(f"signal rule needs 'signal' and 'when': {rule!r}")
+            self._count_uses(rule["when"])
+        for rule in self.rules:
+            conditions.append(self._expression(rule["when"]))
+
+        shared = [name for key, name in self._predicates.items() if self._uses[key] > 1]
+        lines = ["def evaluate(records):"]
+        lines.append("    for trigger, amount, currency, source in records:")
+        if shared:
+            lines.append("        " + " = ".join(shared) + " = None")
+        for position, (rule, condition) in enumerate(zip(self.rules, conditions)):
+            signal = {
+                "signal": rule["signal"],
+                "recommended_product": rule.get("recommended_product", ""),
+                "confidence": rule.get("confidence", "HIGH"),
+            }
+            if self.timed:
+                lines.append("        started = perf_counter()")
+                lines.append(f"        matched = {condition}")
+                lines.append(f"        seconds[{position}] += perf_counter() - started")
+                condition = "matched"
+            lines.append(f"        if {condition}:")
+            lines.append(f"            hits[{position}] += 1")
+            lines.append(
+                "            yield {"
+                f"'signal': {signal['signal']!r}, "
+                f"'recommended_product': {signal['recommended_product']!r}, "
+                "'trigger_transaction': trigger, "
+                f"'confidence': {signal['confidence']!r}}}"
+            )
+        source = "\n".join(lines) + "\n"
+        namespace = dict(self._constants, hits=self.hits, seconds=self.seconds, perf_counter=time.perf_counter)
+        exec(compile(source, "<signal rules>", "exec"), namespace)
+        self.evaluate = namespace["evaluate"]
+        return source
+
+    @staticmethod
+    def _leaf_key(node: dict):
+        value = node.get("value")
+        if isinstance(value, list):
+            value = tuple(value)
+        return node.get("field"), node.get("op"), value
+
+    def _count_uses(self, node):
+        if "all" in node or "any" in node:
+            for child in node["all"] if "all" in node else node["any"]:
+                self._count_uses(child)
+        elif "not" in node:
+            self._count_uses(node["not"])
+        else:
+            key = self._leaf_key(node)
+            self._uses[key] = self._uses.get(key, 0) + 1
+
+    def _constant(self, value):
+        name = f"c{len(self._constants)}"
+        self._constants[name] = value
+        return name
+
+    def _expression(self, node) -> str:
+        # An empty "all" always holds and an empty "any" never does, as with
+        # all() and any(); the batch path's _rows agrees.
+        if "all" in node:
+            if not node["all"]:
+                return "True"
+            return "(" + " and ".join(self._expression(child) for child in node["all"]) + ")"
+        if "any" in node:
+            if not node["any"]:
+                return "False"
+            return "(" + " or ".join(self._expression(child) for child in node["any"]) + ")"
+        if "not" in node:
+            return f"(not {self._expression(node['not'])})"
+
+        key = self._leaf_key(node)
+        name = self._predicates.get(key)
+        if name is None:
+            name = f"p{len(self._predicates)}"
+            self._predicates[key] = name
+            self._leaves[name] = self._leaf(node)
+        if self._uses[key] > 1:
+            return f"({name} if {name} is not None else ({name} := {self._leaves[name]}))"
+        return self._leaves[name]
+
+    def _leaf(self, node: dict) -> str:
+        field = node.get("field")
+        op = node.get("op")
+        value = node.get("value")
+        if field not in Transaction._fields:
+            raise ValueError(f"unknown transaction field in signal rule: {field!r}")
+        if op in NUMERIC_OPS:
+            return f"({field} is not None and {field} {NUMERIC_OPS[op]} {self._constant(float(value))})"
+        if op in EQUALITY_OPS:
+            return f"({field} {EQUALITY_OPS[op]} {self._constant(value)})"
+        if op in ("in", "not_in"):
+            negate = "not " if op == "not_in" else ""
+            return f"({field} {negate}in {self._constant(frozenset(value))})"
+        if op in ("contains_any", "matches"):
+            if field not in STRING_FIELDS:
+                raise ValueError(f"'{op}' needs a text field, got {field!r}")
+            if op == "contains_any":
+                pattern = "|".join(re.escape(str(item)) for item in value)
+            else:
+                pattern = str(value)
+            return f"({self._constant(re.compile(pattern))}.search({field}) is not None)"
+        raise ValueError(f"unknown operator in signal rule: {op!r}")
+
+    def iter_signals(self, records):
+        return self.evaluate(records)
+
+    def iter_signals_batch(self, records, batch_size: int = BATCH_SIZE):
+        outputs = [
+            (rule["signal"], rule.get("recommended_product", ""), rule.get("confidence", "HIGH"))
+            for rule in self.rules
+        ]
+        records = iter(records)
+        while True:
+            chunk = list(islice(records, batch_size))
+            if not chunk:
+                return
+            columns = dict(zip(Transaction._fields, zip(*chunk)))
+            every_row = range(len(chunk))
+            memo = {}
+            fired = {}
+            for position, rule in enumerate(self.rules):
+                started = time.perf_counter() if self.timed else 0.0
+                rows = self._rows(rule["when"], every_row, columns, memo)
+                if self.timed:
+                    self.seconds[position] += time.perf_counter() - started
+                self.hits[position] += len(rows)
+                for row in rows:
+                    fired.setdefault(row, []).append(position)
+            # Per row, rules fire in declaration order, as in the row path.
+            triggers = columns["trigger"]
+            for index in sorted(fired):
+                trigger = triggers[index]
+                for position in fired[index]:
+                    signal, product, confidence = outputs[position]
+                    yield {
+                        "signal": signal,
+                        "recommended_product": product,
+                        "trigger_transaction": trigger,
+                        "confidence": confidence,
+                    }
+
+    def _rows(self, node, rows, columns, memo):
+        # The subset of ``rows`` (ascending chunk indices) where ``node``
+        # holds. ``all`` narrows the rows as it goes, so later predicates
+        # only see rows the earlier ones kept, like the row path's ``and``.
+        if "all" in node:
+            for child in node["all"]:
+                rows = self._rows(child, rows, columns, memo)
+            return list(rows)
+        if "any" in node:
+            found = set()
+            for child in node["any"]:
+                found.update(self._rows(child, [row for row in rows if row not in found], columns, memo))
+            return [row for row in rows if row in found]
+        if "not" in node:
+            excluded = set(self._rows(node["not"], rows, columns, memo))
+            return [row for row in rows if row not in excluded]
+        key = self._leaf_key(node)
+        if self._uses[key] > 1:
+            # Shared between rules: evaluated once per chunk over every row.
+            if key not in memo:
+                memo[key] = set(self._leaf_rows(node, range(len(columns["trigger"])), columns, memo))
+            return [row for row in rows if row in memo[key]]
+        return self._leaf_rows(node, rows, columns, memo)
+
+    def _leaf_rows(self, node: dict, rows, columns, memo):
+        field = node["field"]
+        op = node["op"]
+        value = node.get("value")
+        if np is not None and (op in NUMERIC_OPS or op in EQUALITY_OPS):
+            numeric = op in NUMERIC_OPS
+            array = memo.get((field, numeric))
+            if array is None:
+                # None becomes NaN, which fails every numeric comparison.
+                array = memo[(field, numeric)] = np.array(columns[field], dtype=float if numeric else object)
+            operand = float(value) if numeric else value
+            if isinstance(rows, range):
+                return np.flatnonzero(COMPARE[op](array, operand)).tolist()
+            index = np.asarray(rows, dtype=np.intp)
+            return index[COMPARE[op](array[index], operand)].tolist()
+
+        if op in NUMERIC_OPS:
+            bound = float(value)
+
+            def test(item):
+                return item is not None and COMPARE[op](item, bound)
+        elif op in EQUALITY_OPS:
+            def test(item):
+                return COMPARE[op](item, value)
+        elif op in ("in", "not_in"):
+            members = frozenset(value)
+
+            def test(item):
+                return (item in members) != (op == "not_in")
+        else:
+            pattern = re.compile("|".join(re.escape(str(item)) for item in value) if op == "contains_any" else str(value))
+
+            def test(item):
+                return pattern.search(item) is not None
+        # Values repeat heavily within a chunk (sources, currencies), so each
+        # distinct one is tested once.
+        column = columns[field]
+        outcomes = {}
+        hits = []
+        for row in rows:
+            item = column[row]
+            outcome = outcomes.get(item)
+            if outcome is None:
+                outcome = outcomes[item] = test(item)
+            if outcome:
+                hits.append(row)
+        return hits
+
+    def report(self) -> str:
+        parts = []
+        for rule, hits, seconds in zip(self.rules, self.hits, self.seconds):
+            part = f"{rule['signal']}={hits}"
+            if self.timed:
+                part += f" ({seconds * 1e3:.2f}ms)"
+            parts.append(part)
+        return ", ".join(parts)
+
+
+def load_rule_plan(path: Path = RULES_PATH, timed: bool = RULE_TIMING):
+    if not path.exists():
+        return None
+    config = json.loads(path.read_text(encoding="utf-8"))
+    return RulePlan(config.get("rules") or [], timed=timed)
 
 
 def append_opportunities(dossier: dict, signals):
@@ -137,21 +655,106 @@ Senior Banking Advisor
 """
 
 
-def main():
-    dossier = load_json(DOSSIER_PATH)
-    lines = load_lines(LOG_PATH)
-
-    transactions = [parse_transaction(line) for line in lines if line.strip()]
-    signals = detect_signals(transactions)
+def run(
+    dossier: dict,
+    log_path: Path = LOG_PATH,
+    brief_path: Path = SALES_BRIEF_PATH,
+    incremental: bool = INCREMENTAL,
+    checkpoint_path: Path = CHECKPOINT_PATH,
+    batch: bool = BATCH,
+    rules_path: Path = RULES_PATH,
+    on_signal=None,
+    out=None,
+) -> dict:
+    # stdin has no stable offsets, so it is always read in full.
+    incremental = incremental and str(log_path) != STDIN_PATH
+
+    checkpoint = None
+    seen = None
+    if incremental:
+        checkpoint = load_checkpoint(checkpoint_path, log_path)
+        lines = iter_appended_lines(log_path, checkpoint)
+        seen = opportunity_keys(dossier)
+    else:
+        lines = iter_lines(log_path)
+
+    # read line -> parse -> detect -> emit; only the signals are retained.
+    signals = []
+    with instrumentation.stage("load_rules"):
+        plan = load_rule_plan(rules_path)
+    if plan is not None:
+        detect = plan.iter_signals_batch if batch else plan.iter_signals
+    else:
+        detect = iter_signals_batch if batch else iter_signals
+    # The stream is lazy, so "detect" covers reading and parsing as well.
+    with instrumentation.stage("detect"):
+        transactions = cancellation.checked(iter_transactions(lines))
+        for signal in detect(instrumentation.counted(transactions, "transactions_parsed")):
+            if seen is not None:
+                key = (signal["signal"], signal["trigger_transaction"])
+                if key in seen:
+                    continue
+                seen.add(key)
+            if on_signal is not None:
+                on_signal(signal)
+            signals.append(signal)
+    instrumentation.count("signals_emitted", len(signals))
+    cancellation.check()
 
     append_opportunities(dossier, signals)
 
-    DOSSIER_PATH.write_text(json.dumps(dossier, indent=2) + "\n", encoding="utf-8")
-    SALES_BRIEF_PATH.write_text(build_sales_brief(dossier, signals), encoding="utf-8")
+    with instrumentation.stage("write_brief"):
+        if not incremental:
+            brief_path.write_text(build_sales_brief(dossier, signals), encoding="utf-8")
+        elif signals or not brief_path.exists():
+            brief_path.write_text(
+                build_sales_brief(dossier, dossier["cross_sell_opportunities"]), encoding="utf-8"
+            )
+
+    if checkpoint is not None:
+        save_checkpoint(checkpoint_path, checkpoint)
 
     products = sorted({s["recommended_product"] for s in signals})
-    print("signals_detected:", ", ".join(sorted({s["signal"] for s in signals})) or "NONE")
-    print("products:", ", ".join(products) or "NONE")
+    print("signals_detected:", ", ".join(sorted({s["signal"] for s in signals})) or "NONE", file=out)
+    print("products:", ", ".join(products) or "NONE", file=out)
+    if plan is not None:
+        print(f"rule_hits: {plan.report() or 'NONE'}", file=out)
+    if checkpoint is not None:
+        print(f"checkpoint_offset: {checkpoint.get('offset', 0)}", file=out)
+
+    return dossier
+
+
+def write_dossier(path: Path, dossier: dict):
+    dossier_store.FileStore(path).save(dossier)
+
+
+def follow(poll_seconds: float = POLL_SECONDS):
+    def emit(signal):
+        print(json.dumps(signal), flush=True)
+
+    with open(os.devnull, "w", encoding="utf-8") as quiet:
+        try:
+            while True:
+                with dossier_store.FileStore(DOSSIER_PATH).lock():
+                    dossier = load_json(DOSSIER_PATH)
+                    before = len(dossier.get("cross_sell_opportunities") or [])
+                    dossier = run(dossier, incremental=True, on_signal=emit, out=quiet)
+                    if len(dossier["cross_sell_opportunities"]) != before:
+                        write_dossier(DOSSIER_PATH, dossier)
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            pass
+
+
+def main():
+    if FOLLOW:
+        follow()
+        return
+    with instrumentation.agent("sales"), dossier_store.FileStore(DOSSIER_PATH).lock():
+        dossier = run(load_json(DOSSIER_PATH))
+        with instrumentation.stage("write_dossier"):
+            dossier_patch.write_result(DOSSIER_PATH, dossier, PATCH_OPS)
 
 
 if __name__ == "__main__":
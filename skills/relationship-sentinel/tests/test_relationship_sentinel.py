@@ -0,0 +1,46 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(ROOT / "skills" / "relationship-sentinel" / "scripts"))
+import relationship_sentinel  # noqa: E402
+
+LINES = [
+    "id=T1, amount=2500000, currency=USD, source=VC Funding",
+    "id=T2, amount=120, currency=EUR, source=vendor",
+    "id=T3, currency=GBP, source=payroll",
+]
+
+
+def rule(signal: str, when: dict) -> dict:
+    return {"signal": signal, "recommended_product": "", "when": when}
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_empty_combinators(batch):
+    rules = [
+        rule("ALWAYS", {"all": []}),
+        rule("NEVER", {"any": []}),
+        rule("NOT_NEVER", {"not": {"any": []}}),
+        rule("BIG_OR_NOTHING", {"any": [{"all": []}, {"field": "amount", "op": "gt", "value": 1}]}),
+    ]
+    plan = relationship_sentinel.RulePlan(rules)
+    records = list(relationship_sentinel.iter_transactions(LINES))
+    detect = plan.iter_signals_batch if batch else plan.iter_signals
+    fired = [(signal["signal"], signal["trigger_transaction"]) for signal in detect(records)]
+    assert fired == [
+        (signal, trigger)
+        for trigger in ("T1", "T2", "T3")
+        for signal in ("ALWAYS", "NOT_NEVER", "BIG_OR_NOTHING")
+    ]
+    assert plan.hits == [3, 0, 3, 3]
+
+
+def test_batch_matches_row_plan_on_default_rules():
+    records = list(relationship_sentinel.iter_transactions(LINES * 50))
+    rows = relationship_sentinel.load_rule_plan()
+    batch = relationship_sentinel.load_rule_plan()
+    assert list(batch.iter_signals_batch(records, 7)) == list(rows.iter_signals(records))
+    assert batch.hits == rows.hits
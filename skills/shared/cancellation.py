@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""Cooperative stop for agents run in-process.
+
+Threads cannot be interrupted, so the orchestrator hands an agent a
+``threading.Event`` through ``scope`` and the agent polls it: ``check()``
+between steps, and ``checked()`` around long streams (transaction logs,
+statement lines). Both raise ``Cancelled`` once the event is set.
+
+Outside a scope (standalone and subprocess runs) ``check`` is a no-op and
+``checked`` returns the stream untouched.
+"""
+import contextlib
+from contextvars import ContextVar
+
+CHECK_EVERY = 4096
+
+_current = ContextVar("cancellation_event", default=None)
+
+
+class Cancelled(Exception):
+    pass
+
+
+@contextlib.contextmanager
+def scope(event):
+    token = _current.set(event)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def check():
+    event = _current.get()
+    if event is not None and event.is_set():
+        raise Cancelled("stopped by the orchestrator")
+
+
+def checked(iterable, every: int = CHECK_EVERY):
+    event = _current.get()
+    if event is None:
+        return iterable
+    return _checking(iterable, event, every)
+
+
+def _checking(iterable, event, every: int):
+    for index, item in enumerate(iterable):
+        if index % every == 0 and event.is_set():
+            raise Cancelled("stopped by the orchestrator")
+        yield item
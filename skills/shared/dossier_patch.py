@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Compact dossier patches exchanged between the agents and the autopilot.
+
+A patch is a list of operations on top-level dossier keys, applied in order:
+
+- ``{"op": "set", "key": k, "value": v}`` replaces the value;
+- ``{"op": "append", "key": k, "value": [...]}`` extends a list;
+- ``{"op": "union", "key": k, "value": [...]}`` adds the items not already
+  present, keeping their order.
+
+Each agent declares ``PATCH_OPS`` (key -> op, in merge order). When the
+autopilot sets ``DOSSIER_PATCH_PATH``, ``write_result`` writes the patch
+there instead of rewriting the whole dossier.
+"""
+import json
+import os
+from pathlib import Path
+
+import dossier_store
+
+PATCH_PATH = os.environ.get("DOSSIER_PATCH_PATH") or None
+
+
+def item_key(item) -> str:
+    # Hashable stand-in for a list item, so a union over long lists of dicts
+    # (sentinel opportunities) is a set lookup rather than a list scan.
+    return json.dumps(item, sort_keys=True)
+
+
+def make_patch(before: dict, after: dict, ops: dict) -> list:
+    """Operations that turn ``before`` into ``after`` for the keys in ``ops``."""
+    patch = []
+    for key, op in ops.items():
+        if key not in after:
+            continue
+        value = after[key]
+        old = before.get(key)
+        if op == "set":
+            if key not in before or old != value:
+                patch.append({"op": "set", "key": key, "value": value})
+            continue
+        if not isinstance(value, list):
+            continue
+        if op == "append":
+            # Agents append to the list they were handed; send only the tail.
+            if isinstance(old, list) and value[:len(old)] == old:
+                value = value[len(old):]
+        elif op == "union":
+            present = {item_key(item) for item in old} if isinstance(old, list) else set()
+            value = [item for item in value if item_key(item) not in present]
+        else:
+            raise ValueError(f"unknown patch op for {key}: {op}")
+        # An empty list still creates the key when the input had none.
+        if value or not isinstance(old, list):
+            patch.append({"op": op, "key": key, "value": value})
+    return patch
+
+
+def apply_patch(dossier: dict, patch: list) -> dict:
+    for operation in patch:
+        key, value = operation["key"], operation["value"]
+        if operation["op"] == "set":
+            dossier[key] = value
+            continue
+        existing = dossier.get(key)
+        if not isinstance(existing, list):
+            existing = []
+        if operation["op"] == "append":
+            existing.extend(value)
+        else:
+            present = {item_key(item) for item in existing}
+            for item in value:
+                marker = item_key(item)
+                if marker not in present:
+                    present.add(marker)
+                    existing.append(item)
+        dossier[key] = existing
+    return dossier
+
+
+def encode(data) -> str:
+    return json.dumps(data, separators=(",", ":"))
+
+
+def write_result(dossier_path: Path, dossier: dict, ops: dict, patch_path=PATCH_PATH):
+    """Write an agent's result: a patch against its input when the autopilot
+    asked for one, the full dossier otherwise."""
+    if patch_path is None:
+        dossier_store.FileStore(dossier_path).save(dossier)
+        return
+    # The input dossier is still on disk untouched; the agent mutated a copy.
+    before = json.loads(dossier_path.read_text(encoding="utf-8")) if dossier_path.exists() else {}
+    Path(patch_path).write_text(encode(make_patch(before, dossier, ops)), encoding="utf-8")
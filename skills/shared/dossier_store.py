@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Dossier storage with atomic writes, advisory locks and optimistic versions.
+
+``FileStore`` keeps one dossier in one JSON file. Writes go to a temporary
+file in the same directory, are fsynced and renamed over the target, so a
+reader sees the old or the new dossier and never a torn one. Writers hold an
+exclusive ``flock`` on ``.<dossier>.lock`` for their read-modify-write, and
+``.<dossier>.version`` counts committed writes: ``save(..., expected_version=n)``
+raises ``VersionConflict`` when someone else committed after version ``n``
+was read. Reads take no lock.
+
+``SQLiteStore`` keeps many clients' dossiers in one database in WAL mode, so
+readers never wait for a writer, with the version on each row and indexed
+``entity_name``, ``state`` and ``credit_decision`` columns for lookups.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # no advisory locks; atomic writes still apply
+    fcntl = None
+
+
+class VersionConflict(Exception):
+    pass
+
+
+_held = {}
+_held_guard = threading.Lock()
+
+
+@contextlib.contextmanager
+def file_lock(path: Path):
+    """Exclusive advisory lock on ``.<name>.lock`` beside ``path``.
+
+    Re-entrant within a process (flock would deadlock on a second descriptor
+    for the same file) and exclusive between its threads.
+    """
+    path = Path(path)
+    lock_path = path.with_name(f".{path.name}.lock")
+    key = str(lock_path.resolve())
+    with _held_guard:
+        entry = _held.setdefault(key, {"thread_lock": threading.RLock(), "depth": 0, "handle": None})
+    with entry["thread_lock"]:
+        if entry["depth"] == 0:
+            lock_path.parent.mkdir(parents=True, exist_ok=True)
+            handle = open(lock_path, "a+")
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            entry["handle"] = handle
+        entry["depth"] += 1
+        try:
+            yield
+        finally:
+            entry["depth"] -= 1
+            if entry["depth"] == 0:
+                handle, entry["handle"] = entry["handle"], None
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+                handle.close()
+
+
+def write_atomic(path: Path, text: str):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    mode = path.stat().st_mode & 0o777 if path.exists() else 0o644
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.chmod(temp_name, mode)
+        os.replace(temp_name, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_name)
+        raise
+    # Persist the rename itself.
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def encode_dossier(dossier: dict) -> str:
+    return json.dumps(dossier, indent=2) + "\n"
+
+
+class FileStore:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.version_path = self.path.with_name(f".{self.path.name}.version")
+
+    def lock(self):
+        return file_lock(self.path)
+
+    def version(self) -> int:
+        try:
+            return int(self.version_path.read_text(encoding="utf-8").strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def load(self):
+        """The dossier and the version it was read at."""
+        while True:
+            version = self.version()
+            try:
+                text = self.path.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                text = ""
+            # A commit between the two reads may have swapped the file; retry.
+            if self.version() == version:
+                return (json.loads(text) if text.strip() else {}), version
+
+    def save(self, dossier: dict, expected_version: int = None) -> int:
+        with self.lock():
+            current = self.version()
+            if expected_version is not None and expected_version != current:
+                raise VersionConflict(f"{self.path}: expected version {expected_version}, found {current}")
+            write_atomic(self.path, encode_dossier(dossier))
+            write_atomic(self.version_path, f"{current + 1}\n")
+            return current + 1
+
+    @contextlib.contextmanager
+    def transaction(self):
+        """Lock, load, let the caller mutate the dossier, then commit it."""
+        with self.lock():
+            dossier, version = self.load()
+            yield dossier
+            self.save(dossier, expected_version=version)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dossiers (
+    client TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    entity_name TEXT,
+    state TEXT,
+    credit_decision TEXT,
+    updated_at REAL NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS dossiers_entity_name ON dossiers (entity_name);
+CREATE INDEX IF NOT EXISTS dossiers_state ON dossiers (state);
+CREATE INDEX IF NOT EXISTS dossiers_credit_decision ON dossiers (credit_decision);
+"""
+INDEXED = ("entity_name", "state", "credit_decision")
+
+
+class SQLiteStore:
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+        with self._connect() as connection:
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 connections stay on the thread that opened them.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def load(self, client: str):
+        row = self._connect().execute(
+            "SELECT body, version FROM dossiers WHERE client = ?", (client,)
+        ).fetchone()
+        if row is None:
+            return {}, 0
+        return json.loads(row[0]), row[1]
+
+    def _write(self, connection, client: str, dossier: dict, expected_version):
+        row = connection.execute("SELECT version FROM dossiers WHERE client = ?", (client,)).fetchone()
+        current = row[0] if row else 0
+        if expected_version is not None and expected_version != current:
+            raise VersionConflict(f"{client}: expected version {expected_version}, found {current}")
+        values = [dossier.get(field) if isinstance(dossier.get(field), str) else None for field in INDEXED]
+        connection.execute(
+            "INSERT INTO dossiers (client, version, entity_name, state, credit_decision, updated_at, body) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (client) DO UPDATE SET version = excluded.version, entity_name = excluded.entity_name, "
+            "state = excluded.state, credit_decision = excluded.credit_decision, "
+            "updated_at = excluded.updated_at, body = excluded.body",
+            (client, current + 1, *values, time.time(), json.dumps(dossier)),
+        )
+        return current + 1
+
+    @contextlib.contextmanager
+    def _immediate(self):
+        connection = self._connect()
+        # IMMEDIATE takes the write lock up front, so the version check and
+        # the write cannot interleave with another writer.
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def save(self, client: str, dossier: dict, expected_version: int = None) -> int:
+        with self._immediate() as connection:
+            return self._write(connection, client, dossier, expected_version)
+
+    @contextlib.contextmanager
+    def transaction(self, client: str):
+        with self._immediate() as connection:
+            row = connection.execute("SELECT body FROM dossiers WHERE client = ?", (client,)).fetchone()
+            dossier = json.loads(row[0]) if row else {}
+            yield dossier
+            self._write(connection, client, dossier, None)
+
+    def find(self, **filters) -> list:
+        """(client, version, dossier) rows matching every given indexed field."""
+        unknown = set(filters) - set(INDEXED)
+        if unknown:
+            raise ValueError(f"not an indexed field: {', '.join(sorted(unknown))}")
+        clauses = [f"{field} = ?" for field in filters]
+        query = "SELECT client, version, body FROM dossiers"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        rows = self._connect().execute(query + " ORDER BY client", tuple(filters.values())).fetchall()
+        return [(client, version, json.loads(body)) for client, version, body in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up dossiers in a SQLite dossier store.")
+    parser.add_argument("database", type=Path)
+    parser.add_argument("--entity-name")
+    parser.add_argument("--state")
+    parser.add_argument("--decision", dest="credit_decision")
+    args = parser.parse_args()
+
+    filters = {field: getattr(args, field) for field in INDEXED if getattr(args, field) is not None}
+    for client, version, dossier in SQLiteStore(args.database).find(**filters):
+        print(
+            f"{client}  v{version}  {dossier.get('entity_name') or '-'}  "
+            f"{dossier.get('state') or '-'}  {dossier.get('credit_decision') or '-'}"
+        )
+
+
+if __name__ == "__main__":
+    main()
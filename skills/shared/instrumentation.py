@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""Stage timers, counters and optional profiling shared by the agent scripts.
+
+Everything is off unless ``AUTOPILOT_TRACE`` names a JSON-lines file; then
+each ``agent()`` scope appends one record with its stage timings, counters
+and (with ``AUTOPILOT_PROFILE=cprofile`` and/or ``tracemalloc``) profile
+data. Agents running as subprocesses inherit the variable and append to the
+same file, which the autopilot folds into one run report with
+``build_report``. When off, ``stage()`` and ``agent()`` return a shared
+no-op context manager and ``count()`` returns immediately.
+"""
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from pathlib import Path
+
+TRACE_PATH = os.environ.get("AUTOPILOT_TRACE") or None
+PROFILE = {mode.strip() for mode in os.environ.get("AUTOPILOT_PROFILE", "").split(",") if mode.strip()}
+ENABLED = TRACE_PATH is not None
+PROFILE_TOP = 15
+
+_NULL = contextlib.nullcontext()
+_current = ContextVar("instrumentation_scope", default=None)
+_write_lock = threading.Lock()
+
+
+def emit(record: dict):
+    line = json.dumps(record, default=str) + "\n"
+    with _write_lock:
+        # One append per record keeps lines intact across processes.
+        with open(TRACE_PATH, "a", encoding="utf-8") as handle:
+            handle.write(line)
+
+
+class Scope:
+    def __init__(self, name: str):
+        self.name = name
+        self.stages = {}
+        self.counters = {}
+
+
+@contextlib.contextmanager
+def _timed_stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        scope = _current.get()
+        if scope is None:
+            emit({"agent": "unscoped", "pid": os.getpid(), "stages": {name: elapsed}, "counters": {}})
+        else:
+            scope.stages[name] = scope.stages.get(name, 0.0) + elapsed
+
+
+def stage(name: str):
+    return _timed_stage(name) if ENABLED else _NULL
+
+
+def count(name: str, amount: int = 1):
+    if not ENABLED:
+        return
+    scope = _current.get()
+    if scope is not None:
+        scope.counters[name] = scope.counters.get(name, 0) + amount
+
+
+def counted(iterable, name: str):
+    # Wraps a stream only when tracing, so the hot path is untouched otherwise.
+    if not ENABLED:
+        return iterable
+    return _counting(iterable, name)
+
+
+def _counting(iterable, name: str):
+    total = 0
+    try:
+        for item in iterable:
+            total += 1
+            yield item
+    finally:
+        count(name, total)
+
+
+def _profile_stats(profiler) -> list:
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{Path(filename).name}:{line}({function})",
+            "calls": calls,
+            "tottime": round(tottime, 6),
+            "cumtime": round(cumtime, 6),
+        })
+    rows.sort(key=lambda row: row["cumtime"], reverse=True)
+    return rows[:PROFILE_TOP]
+
+
+@contextlib.contextmanager
+def _agent_scope(name: str):
+    scope = Scope(name)
+    token = _current.set(scope)
+    profiler = None
+    if "cprofile" in PROFILE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # another profiler is active in this process
+            profiler = None
+    if "tracemalloc" in PROFILE:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+    started = time.perf_counter()
+    try:
+        yield scope
+    finally:
+        record = {
+            "agent": name,
+            "pid": os.getpid(),
+            "seconds": time.perf_counter() - started,
+            "stages": scope.stages,
+            "counters": scope.counters,
+        }
+        if profiler is not None:
+            profiler.disable()
+            record["profile"] = _profile_stats(profiler)
+        if "tracemalloc" in PROFILE:
+            current, peak = tracemalloc.get_traced_memory()
+            record["memory"] = {"current_bytes": current, "peak_bytes": peak}
+        _current.reset(token)
+        emit(record)
+
+
+def agent(name: str):
+    return _agent_scope(name) if ENABLED else _NULL
+
+
+def reset_trace(path=TRACE_PATH):
+    if path is not None:
+        Path(path).write_text("", encoding="utf-8")
+
+
+def percentile(values, pct: float) -> float:
+    # Nearest rank, matching the benchmarks.
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def tail_latency(values) -> dict:
+    values = list(values)
+    if not values:
+        return {}
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "max": max(values),
+    }
+
+
+def build_report(path=TRACE_PATH) -> dict:
+    """Fold a JSON-lines trace into per-agent totals and run-time percentiles."""
+    agents = {}
+    profiles = []
+    durations = {}
+    if path is None or not Path(path).exists():
+        return {"agents": agents, "profiles": profiles}
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            summary = agents.setdefault(
+                record["agent"], {"runs": 0, "seconds": 0.0, "stages": {}, "counters": {}}
+            )
+            summary["runs"] += 1
+            summary["seconds"] += record.get("seconds", 0.0)
+            durations.setdefault(record["agent"], []).append(record.get("seconds", 0.0))
+            for key, value in record.get("stages", {}).items():
+                summary["stages"][key] = summary["stages"].get(key, 0.0) + value
+            for key, value in record.get("counters", {}).items():
+                summary["counters"][key] = summary["counters"].get(key, 0) + value
+            if "memory" in record:
+                peak = summary.setdefault("peak_bytes", 0)
+                summary["peak_bytes"] = max(peak, record["memory"]["peak_bytes"])
+            if "profile" in record:
+                profiles.append({"agent": record["agent"], "pid": record["pid"], "top": record["profile"]})
+    for name, values in durations.items():
+        agents[name]["latency"] = tail_latency(values)
+    return {"agents": agents, "profiles": profiles}
+
+
+def format_report(report: dict) -> list:
+    lines = []
+    for name, summary in report["agents"].items():
+        stages = ", ".join(f"{key} {value * 1000:.1f}ms" for key, value in summary["stages"].items())
+        counters = ", ".join(f"{key}={value}" for key, value in summary["counters"].items())
+        line = f"- {name}: {summary['runs']} run(s), {summary['seconds'] * 1000:.1f}ms"
+        if stages:
+            line += f" [{stages}]"
+        if counters:
+            line += f" {counters}"
+        latency = summary.get("latency")
+        if latency and summary["runs"] > 1:
+            line += " " + " ".join(f"{key}={latency[key] * 1000:.1f}ms" for key in ("p50", "p95", "p99"))
+        if "peak_bytes" in summary:
+            line += f" peak={summary['peak_bytes'] / 1024:.0f}KiB"
+        lines.append(line)
+    return lines